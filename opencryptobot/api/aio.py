@@ -0,0 +1,215 @@
+import json
+import time
+import asyncio
+import aiohttp
+import threading
+
+from opencryptobot.metrics import Metrics
+from opencryptobot.api.coingecko import CoinGecko
+from opencryptobot.api.transport import Transport
+from opencryptobot.api.coinpaprika import CoinPaprika
+from opencryptobot.api.cryptopanic import CryptoPanic
+from opencryptobot.config import ConfigManager as Cfg
+from opencryptobot.api.cryptocompare import CryptoCompare
+from opencryptobot.api.responsecache import ResponseCache
+
+
+class AsyncResponse(object):
+    """Response of an asynchronous request. Offers the
+    subset of 'requests.Response' that API clients use"""
+
+    def __init__(self, url, status_code, content):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise aiohttp.ClientResponseError(
+                None, (), status=self.status_code, message=f"{self.status_code} Error for url: {self.url}")
+
+
+class AsyncLoop(object):
+    """Event loop in a background thread that plugins use to run
+    several upstream requests concurrently from a dispatcher thread"""
+
+    _loop = None
+    _session = None
+    _pending = dict()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def gather(*calls, timeout=None):
+        """Run coroutines and plain functions concurrently and return
+        their results in the same order. Exceptions are returned
+        instead of being raised"""
+
+        async def _gather():
+            loop = asyncio.get_running_loop()
+
+            aws = list()
+            for call in calls:
+                if asyncio.iscoroutine(call):
+                    aws.append(call)
+                else:
+                    aws.append(loop.run_in_executor(None, call))
+
+            return await asyncio.gather(*aws, return_exceptions=True)
+
+        return AsyncLoop.run(_gather(), timeout=timeout)
+
+    @staticmethod
+    def first(*calls, timeout=None):
+        """Run coroutines and plain functions concurrently and return the
+        first result that isn't empty. Remaining calls are cancelled (plain
+        functions can't be interrupted and finish in the background).
+        Returns None if no call returns a result"""
+
+        async def _first():
+            loop = asyncio.get_running_loop()
+
+            pending = set()
+            for call in calls:
+                if asyncio.iscoroutine(call):
+                    pending.add(asyncio.ensure_future(call))
+                else:
+                    pending.add(loop.run_in_executor(None, call))
+
+            try:
+                while pending:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED)
+
+                    for future in done:
+                        if not future.exception() and future.result():
+                            return future.result()
+                return None
+            finally:
+                for future in pending:
+                    future.cancel()
+
+        return AsyncLoop.run(_first(), timeout=timeout)
+
+    @staticmethod
+    def run(coro, timeout=None):
+        """Run coroutine in background loop and return its result"""
+
+        future = asyncio.run_coroutine_threadsafe(coro, AsyncLoop.get_loop())
+        return future.result(timeout)
+
+    @staticmethod
+    def get_loop():
+        if AsyncLoop._loop is None:
+            with AsyncLoop._lock:
+                if AsyncLoop._loop is None:
+                    loop = asyncio.new_event_loop()
+
+                    thread = threading.Thread(target=loop.run_forever, name="AsyncLoop")
+                    thread.daemon = True
+                    thread.start()
+
+                    AsyncLoop._loop = loop
+        return AsyncLoop._loop
+
+    @staticmethod
+    async def fetch(url, timeout=None):
+        """Send GET request. Concurrent requests for the same URL share one request"""
+
+        cached = ResponseCache.lookup(url)
+
+        if cached is not None:
+            return cached
+
+        if url in AsyncLoop._pending:
+            return await asyncio.shield(AsyncLoop._pending[url])
+
+        future = asyncio.get_running_loop().create_future()
+        AsyncLoop._pending[url] = future
+
+        try:
+            response = await AsyncLoop._get(url, timeout)
+            ResponseCache.put(url, response)
+            future.set_result(response)
+            return response
+        except Exception as e:
+            future.set_exception(e)
+            # Mark exception as retrieved in case nobody else is waiting
+            future.exception()
+            raise e
+        finally:
+            del AsyncLoop._pending[url]
+
+    @staticmethod
+    async def _get(url, timeout):
+        if timeout is None:
+            timeout = Transport.get_timeout(url)
+
+        timeout = aiohttp.ClientTimeout(total=timeout)
+        start = time.monotonic()
+
+        try:
+            async with AsyncLoop._get_session().get(url, timeout=timeout) as res:
+                response = AsyncResponse(url, res.status, await res.read())
+        except Exception:
+            Metrics.upstream(url, time.monotonic() - start, "error")
+            raise
+
+        Metrics.upstream(url, time.monotonic() - start, response.status_code)
+        return response
+
+    @staticmethod
+    def _get_session():
+        # Only called from the loop thread, no lock needed
+        if AsyncLoop._session is None:
+            pool_size = Cfg.get("http", "pool_size") or Transport.DEF_POOL_SIZE
+            connector = aiohttp.TCPConnector(limit_per_host=pool_size)
+            AsyncLoop._session = aiohttp.ClientSession(connector=connector)
+        return AsyncLoop._session
+
+
+class _AsyncClient(object):
+    """Replaces blocking '_request' of an API client so that
+    every API method of the client returns a coroutine"""
+
+    _request_timeout = None
+
+    @Metrics.api_request
+    async def _request(self, url):
+        self.response = await AsyncLoop.fetch(url, timeout=self._request_timeout)
+        self.response.raise_for_status()
+        return json.loads(self.response.content.decode('utf-8'))
+
+
+class AsyncCoinGecko(_AsyncClient, CoinGecko):
+
+    async def get_global(self):
+        """Get cryptocurrency global data"""
+
+        api_url = f'{self._base_url}global'
+        return (await self._request(api_url))['data']
+
+    async def get_fiat_list(self):
+        """Get list of all supported fiat currencies"""
+
+        fiat_list = list()
+        rates = await self.get_exchange_rates()
+        for key, value in rates["rates"].items():
+            if value["type"] == "fiat":
+                fiat_list.append(key)
+        return fiat_list
+
+
+class AsyncCoinPaprika(_AsyncClient, CoinPaprika):
+    pass
+
+
+class AsyncCryptoCompare(_AsyncClient, CryptoCompare):
+    pass
+
+
+class AsyncCryptoPanic(_AsyncClient, CryptoPanic):
+    pass
@@ -1,73 +1,384 @@
+import os
+import json
+import time
 import logging
+import threading
+import opencryptobot.utils as utl
 
+from types import MappingProxyType
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
 from coinmarketcap import Market
+from opencryptobot.config import ConfigManager as Cfg
+from opencryptobot.profiler import StartupProfiler
 from opencryptobot.api.coingecko import CoinGecko
 from opencryptobot.api.coinpaprika import CoinPaprika
 
 
+# Lookup tables for the CoinGecko coin list. Every field is a read-only
+# mapping: 'symbol' (upper case) and 'name' (lower case) map to a tuple of
+# coin IDs, 'id' maps a coin ID to its entry in the coin list
+CoinIndex = namedtuple("CoinIndex", ["symbol", "id", "name"])
+
+# Cached dataset with the time of its download in seconds
+CacheEntry = namedtuple("CacheEntry", ["time", "data"])
+
+
+def _build_coin_index(coin_list):
+    by_symbol = dict()
+    by_id = dict()
+    by_name = dict()
+
+    for entry in coin_list or []:
+        by_symbol.setdefault(entry["symbol"].upper(), []).append(entry["id"])
+        by_name.setdefault(entry["name"].lower(), []).append(entry["id"])
+        by_id[entry["id"]] = entry
+
+    return CoinIndex(
+        symbol=MappingProxyType({k: tuple(v) for k, v in by_symbol.items()}),
+        id=MappingProxyType(by_id),
+        name=MappingProxyType({k: tuple(v) for k, v in by_name.items()}))
+
+
 class APICache(object):
 
-    cg_fiat_list = list()
-    cg_coin_list = list()
-    cg_exch_list = list()
-    cp_coin_list = list()
-    cmc_coin_list = list()
+    # Symbols that are used by more then one coin on
+    # CoinGecko and the coin ID that should be preferred
+    CG_PREFERRED_IDS = MappingProxyType({
+        "BTC": "bitcoin",
+        "ETH": "ethereum",
+        "USDT": "tether",
+        "USDC": "usd-coin",
+        "DAI": "dai",
+        "BNB": "binancecoin"
+    })
+
+    # Datasets and functions that download them
+    DATASETS = MappingProxyType({
+        "cg_coin_list": lambda: CoinGecko().get_coins_list(),
+        "cg_exch_list": lambda: CoinGecko().get_exchanges_list(),
+        "cp_coin_list": lambda: CoinPaprika().get_list_coins(),
+        "cmc_coin_list": lambda: Market().listings()["data"]
+    })
+
+    # Min seconds between refreshes of a stale dataset after a failed one
+    RETRY_INTERVAL = 60
+
+    # Max seconds that the refresh job waits for all datasets
+    DEF_REFRESH_TIMEOUT = 60
+
+    # Key is dataset name, value is 'CacheEntry'. Replaced as a whole
+    _entries = MappingProxyType(dict())
+    _loaded = False
+
+    # Datasets that are being refreshed and time of last attempt
+    _refreshing = set()
+    _attempts = dict()
+
+    # Datasets that were refreshed at least once
+    _filled = set()
+    _first_refresh = True
+
+    _lock = threading.Lock()
+    _save_lock = threading.Lock()
+    _download_locks = {name: threading.Lock() for name in DATASETS}
+
+    # One thread per dataset so that all can refresh at the same time
+    _executor = ThreadPoolExecutor(max_workers=len(DATASETS), thread_name_prefix="APICache")
 
     @staticmethod
-    def refresh(bot, job):
+    def refresh(context=None):
+        """Refresh all datasets concurrently. Waits at most until the
+        deadline, datasets that take longer are saved once downloaded"""
+
         logging.info("Starting Caching")
 
-        APICache.refresh_coingecko_coin_list()
-        APICache.refresh_coingecko_exchange_list()
-        APICache.refresh_coinpaprika_coin_list()
-        APICache.refresh_coinmarketcap_coin_list()
+        start = time.monotonic()
+        timeout = utl.get_seconds(Cfg.get("refresh_timeout")) or APICache.DEF_REFRESH_TIMEOUT
+
+        first = APICache._first_refresh
+        APICache._first_refresh = False
+
+        futures = dict()
+
+        # Every dataset on its own so that one failing
+        # provider doesn't stop the others from refreshing
+        for name in APICache.DATASETS:
+            future = APICache._submit_refresh(name, save=False, retry=False)
+
+            if future is None:
+                logging.info(f"Cached {name} is still refreshing")
+            else:
+                futures[future] = name
+
+        done, pending = wait(futures, timeout=timeout)
+
+        def _save_late(future):
+            if future.result():
+                APICache._save_snapshot()
+
+        for future in pending:
+            logging.warning(f"Refreshing cached {futures[future]} takes longer than {timeout} seconds")
+            future.add_done_callback(_save_late)
+
+        if any(future.result() for future in done):
+            APICache._save_snapshot()
 
-        logging.info("Finished Caching")
+        logging.info(f"Finished Caching in {time.monotonic() - start:.2f} seconds")
+
+        if first:
+            StartupProfiler.add("Fill API cache", time.monotonic() - start)
+            StartupProfiler.report("Startup profile - API cache filled")
 
     # Functions to refresh cache ------------------------
 
     @staticmethod
     def refresh_coingecko_coin_list():
-        APICache.cg_coin_list = CoinGecko().get_coins_list()
+        APICache._refresh("cg_coin_list")
 
     @staticmethod
     def refresh_coinpaprika_coin_list():
-        APICache.cp_coin_list = CoinPaprika().get_list_coins()
+        APICache._refresh("cp_coin_list")
 
     @staticmethod
     def refresh_coinmarketcap_coin_list():
-        APICache.cmc_coin_list = Market().listings()["data"]
+        APICache._refresh("cmc_coin_list")
 
     @staticmethod
     def refresh_coingecko_exchange_list():
-        APICache.cg_exch_list = CoinGecko().get_exchanges_list()
+        APICache._refresh("cg_exch_list")
+
+    @staticmethod
+    def _refresh(name, save=True):
+        """Download dataset, replace cached entry and return data"""
+
+        APICache._attempts[name] = time.time()
+
+        with APICache._download_locks[name]:
+            data = APICache.DATASETS[name]()
+            APICache._set(name, CacheEntry(time.time(), data))
+
+        if save:
+            APICache._save_snapshot()
+
+        return data
+
+    @staticmethod
+    def _submit_refresh(name, save=True, retry=True):
+        """Refresh dataset in background if it isn't already. Returns future
+        with True if refreshed, False if it failed or None if not started.
+        If 'retry' is True, failed datasets are retried after an interval"""
+
+        with APICache._lock:
+            if name in APICache._refreshing:
+                return None
+            if retry and time.time() - APICache._attempts.get(name, 0) < APICache.RETRY_INTERVAL:
+                return None
+
+            APICache._refreshing.add(name)
+
+        try:
+            return APICache._executor.submit(APICache._run_refresh, name, save)
+        except Exception:
+            with APICache._lock:
+                APICache._refreshing.discard(name)
+            raise
+
+    @staticmethod
+    def _run_refresh(name, save):
+        start = time.monotonic()
+
+        try:
+            data = APICache._refresh(name, save=save)
+            size = len(data) if data is not None else 0
+
+            logging.info(f"Refreshed cached {name} in {time.monotonic() - start:.2f} seconds ({size} entries)")
+
+            if name not in APICache._filled:
+                APICache._filled.add(name)
+                StartupProfiler.add(f"Fill cached {name}", time.monotonic() - start)
+            return True
+        except Exception as e:
+            logging.error(f"Can't refresh cached {name} after {time.monotonic() - start:.2f} seconds: {repr(e)}")
+            return False
+        finally:
+            with APICache._lock:
+                APICache._refreshing.discard(name)
+
+    @staticmethod
+    def _set(name, entry):
+        with APICache._lock:
+            entries = dict(APICache._entries)
+            entries[name] = entry
+
+            # Replace list and index together so that readers never see
+            # a new list with an old index (or the other way around)
+            if name == "cg_coin_list":
+                entries["cg_coin_index"] = CacheEntry(entry.time, _build_coin_index(entry.data))
+
+            APICache._entries = MappingProxyType(entries)
+
+    @staticmethod
+    def _get(name, dataset=None):
+        """Return cached data. If it's older than the refresh interval it's
+        still returned and refreshed in background. Only if nothing is
+        cached (not even in the snapshot file) the caller has to wait"""
+
+        dataset = dataset or name
+
+        max_age = utl.get_seconds(Cfg.get("refresh_cache"))
+
+        # Caching disabled
+        if max_age is None:
+            data = APICache.DATASETS[dataset]()
+            return _build_coin_index(data) if name == "cg_coin_index" else data
+
+        if not APICache._loaded:
+            APICache._load_snapshot()
+
+        entry = APICache._entries.get(name)
+
+        if entry is None:
+            with APICache._download_locks[dataset]:
+                entry = APICache._entries.get(name)
+
+                # Not downloaded by another thread in the meantime
+                if entry is None:
+                    APICache._attempts[dataset] = time.time()
+                    APICache._set(dataset, CacheEntry(time.time(), APICache.DATASETS[dataset]()))
+                    entry = APICache._entries[name]
+
+            APICache._save_snapshot()
+
+        elif time.time() - entry.time > max_age:
+            APICache._submit_refresh(dataset)
+
+        return entry.data
+
+    # Snapshot of cached data -----------------------
+
+    @staticmethod
+    def _load_snapshot():
+        with APICache._save_lock:
+            if APICache._loaded:
+                return
+
+            try:
+                with StartupProfiler.measure("Load cache snapshot"):
+                    APICache._read_snapshot()
+            finally:
+                APICache._loaded = True
+
+    @staticmethod
+    def _read_snapshot():
+        path = Cfg.get("cache_snapshot")
+
+        if not path or not os.path.isfile(path):
+            return
+
+        try:
+            with open(path, "r") as f:
+                snapshot = json.load(f)
+
+            entries = {n: CacheEntry(float(e[0]), e[1]) for n, e in snapshot.items() if n in APICache.DATASETS}
+        except Exception as e:
+            logging.error(f"Can't read cache snapshot: {repr(e)}")
+            return
+
+        for name, entry in entries.items():
+            # Downloaded data is newer than the snapshot
+            if name not in APICache._entries:
+                APICache._set(name, entry)
+
+        logging.info(f"Loaded cached data from {path}")
+
+    @staticmethod
+    def _save_snapshot():
+        path = Cfg.get("cache_snapshot")
+
+        if not path:
+            return
+
+        entries = APICache._entries
+        snapshot = {n: list(e) for n, e in entries.items() if n in APICache.DATASETS}
+
+        try:
+            with APICache._save_lock:
+                data_dir = os.path.dirname(path)
+                if data_dir:
+                    os.makedirs(data_dir, exist_ok=True)
+
+                # Replace file at once so that it's never read half written
+                with open(f"{path}.tmp", "w") as f:
+                    json.dump(snapshot, f)
+                os.replace(f"{path}.tmp", path)
+        except Exception as e:
+            logging.error(f"Can't save cache snapshot: {repr(e)}")
 
     # Functions to return cached data -------------------
 
     @staticmethod
     def get_cg_coins_list():
-        if APICache.cg_coin_list:
-            return APICache.cg_coin_list
-        else:
-            return CoinGecko().get_coins_list()
+        return APICache._get("cg_coin_list")
+
+    @staticmethod
+    def get_cg_coin_index():
+        return APICache._get("cg_coin_index", dataset="cg_coin_list")
 
     @staticmethod
     def get_cp_coin_list():
-        if APICache.cp_coin_list:
-            return APICache.cp_coin_list
-        else:
-            return CoinPaprika().get_list_coins()
+        return APICache._get("cp_coin_list")
 
     @staticmethod
     def get_cmc_coin_list():
-        if APICache.cmc_coin_list:
-            return APICache.cmc_coin_list
-        else:
-            return Market().listings()["data"]
+        return APICache._get("cmc_coin_list")
 
     @staticmethod
     def get_cg_exchanges_list():
-        if APICache.cg_exch_list:
-            return APICache.cg_exch_list
-        else:
-            return CoinGecko().get_exchanges_list()
+        return APICache._get("cg_exch_list")
+
+    @staticmethod
+    def get_age(name):
+        """Return seconds since dataset was downloaded or None if it isn't cached"""
+
+        entry = APICache._entries.get(name)
+        return None if entry is None else time.time() - entry.time
+
+    # Functions to look up cached data ------------------
+
+    @staticmethod
+    def resolve_symbol(symbol):
+        """Return the CoinGecko coin ID for a symbol or None if unknown"""
+
+        symbol = symbol.upper()
+
+        if symbol in APICache.CG_PREFERRED_IDS:
+            return APICache.CG_PREFERRED_IDS[symbol]
+
+        coin_ids = APICache.get_cg_coin_index().symbol.get(symbol)
+        return coin_ids[0] if coin_ids else None
+
+    @staticmethod
+    def get_cg_coin_ids(symbol):
+        """Return all CoinGecko coin IDs that use the given symbol"""
+
+        return APICache.get_cg_coin_index().symbol.get(symbol.upper(), tuple())
+
+    @staticmethod
+    def get_cg_coin(coin_id):
+        """Return the entry (id, symbol, name) of a CoinGecko coin ID"""
+
+        return APICache.get_cg_coin_index().id.get(coin_id)
+
+    @staticmethod
+    def find_cg_coins(name):
+        """Return entries of all CoinGecko coins that contain 'name' in their name"""
+
+        name = name.lower()
+        index = APICache.get_cg_coin_index()
+
+        result = list()
+        for coin_name, coin_ids in index.name.items():
+            if name in coin_name:
+                result.extend(index.id[coin_id] for coin_id in coin_ids)
+        return result
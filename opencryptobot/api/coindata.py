@@ -1,6 +1,7 @@
 import json
 import time
-import requests
+
+from opencryptobot.api.transport import Transport
 
 
 class CoinData(object):
@@ -30,7 +31,7 @@ class CoinData(object):
             CoinData._datetime = now
 
             try:
-                CoinData.response = requests.get(self._url)
+                CoinData.response = Transport.get(self._url)
                 CoinData.response.raise_for_status()
                 CoinData.res_json = json.loads(CoinData.response.content.decode('utf-8'))
             except Exception as e:
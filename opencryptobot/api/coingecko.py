@@ -1,11 +1,14 @@
 import json
-import requests
+
+from opencryptobot.metrics import Metrics
+from opencryptobot.api.transport import Transport
+from opencryptobot.api.responsecache import ResponseCache
 
 
 class CoinGecko(object):
 
     _base_url = 'https://api.coingecko.com/api/v3/'
-    _request_timeout = 120
+    _request_timeout = None  # Use host timeout of transport
 
     response = None
 
@@ -15,14 +18,18 @@ class CoinGecko(object):
         if request_timeout:
             self._request_timeout = request_timeout
 
+    @Metrics.api_request
     def _request(self, url):
         try:
-            self.response = requests.get(url, timeout=self._request_timeout)
+            self.response = ResponseCache.get(url, self._get)
             self.response.raise_for_status()
             return json.loads(self.response.content.decode('utf-8'))
         except Exception as e:
             raise e
 
+    def _get(self, url):
+        return Transport.get(url, timeout=self._request_timeout)
+
     def _api_url_params(self, api_url, params):
         if params:
             api_url += "?"
@@ -102,6 +109,14 @@ class CoinGecko(object):
         api_url = f'{self._base_url}coins/{id}/market_chart?vs_currency={vs_currency}&days={days}'
         return self._request(api_url)
 
+    def get_coin_market_chart_range_by_id(self, id, vs_currency, from_timestamp, to_timestamp):
+        """Get historical market data include price, market cap, and
+        24h volume within a range of timestamps (granularity auto)"""
+
+        api_url = f'{self._base_url}coins/{id}/market_chart/range?vs_currency={vs_currency}' \
+                  f'&from={from_timestamp}&to={to_timestamp}'
+        return self._request(api_url)
+
     # ---------- EVENTS ----------
     def get_events(self, **kwargs):
         """Get events, paginated by 100"""
@@ -1,5 +1,7 @@
 import json
-import requests
+
+from opencryptobot.api.transport import Transport
+from opencryptobot.api.responsecache import ResponseCache
 
 
 class Crypto51(object):
@@ -10,7 +12,7 @@ class Crypto51(object):
 
     def coins(self):
         try:
-            self.response = requests.get(self._base_url)
+            self.response = ResponseCache.get(self._base_url, Transport.get)
             self.response.raise_for_status()
             return json.loads(self.response.content.decode('utf-8'))
         except Exception as e:
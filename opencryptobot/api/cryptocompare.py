@@ -1,5 +1,12 @@
 import json
-import requests
+
+from opencryptobot.metrics import Metrics
+from opencryptobot.api.transport import Transport
+from opencryptobot.api.responsecache import ResponseCache
+
+
+class CryptoCompareError(Exception):
+    pass
 
 
 class CryptoCompare(object):
@@ -15,9 +22,10 @@ class CryptoCompare(object):
         if token:
             self._token = token
 
+    @Metrics.api_request
     def _request(self, url):
         try:
-            self.response = requests.get(url)
+            self.response = ResponseCache.get(url, Transport.get)
             self.response.raise_for_status()
             return json.loads(self.response.content.decode('utf-8'))
         except Exception as e:
@@ -1,6 +1,9 @@
 import json
 import logging
-import requests
+
+from opencryptobot.metrics import Metrics
+from opencryptobot.api.transport import Transport
+from opencryptobot.api.responsecache import ResponseCache
 
 
 class CryptoPanic(object):
@@ -16,9 +19,10 @@ class CryptoPanic(object):
         if token:
             self._token = token
 
+    @Metrics.api_request
     def _request(self, url):
         try:
-            self.response = requests.get(url)
+            self.response = ResponseCache.get(url, Transport.get)
             self.response.raise_for_status()
             return json.loads(self.response.content.decode('utf-8'))
         except Exception as e:
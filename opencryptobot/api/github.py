@@ -1,5 +1,8 @@
 import json
-import requests
+
+from opencryptobot.metrics import Metrics
+from opencryptobot.api.transport import Transport
+from opencryptobot.api.responsecache import ResponseCache
 
 
 class GitHub(object):
@@ -16,9 +19,10 @@ class GitHub(object):
         if github_repo:
             self._gh_repo = github_repo
 
+    @Metrics.api_request
     def _request(self, url):
         try:
-            self.response = requests.get(url)
+            self.response = ResponseCache.get(url, Transport.get)
             self.response.raise_for_status()
             return json.loads(self.response.content.decode('utf-8'))
         except Exception as e:
@@ -0,0 +1,151 @@
+import time
+import logging
+import opencryptobot.utils as utl
+
+from types import MappingProxyType
+from collections import namedtuple
+from opencryptobot.config import ConfigManager as Cfg
+from opencryptobot.api.coingecko import CoinGecko
+
+
+# Prefetched CoinGecko markets for one target currency. 'coins' is a tuple
+# of market entries ordered by market cap, 'id' is a read-only mapping of
+# coin ID to its entry and 'time' is the time of the download in seconds
+MarketSnapshot = namedtuple("MarketSnapshot", ["time", "coins", "id"])
+
+
+class MarketCache(object):
+    """Markets of the top coins by market cap in all configured target
+    currencies, downloaded by a job at a fixed interval. Commands read
+    prices, market caps and volumes from the snapshot if it's fresh
+    enough and otherwise request CoinGecko directly"""
+
+    DEF_TOP = 250  # Number of coins
+    DEF_INTERVAL = 60  # In seconds
+    DEF_VS_CURRENCIES = ("usd", "eur", "btc", "eth")
+
+    # Max number of coins per page of CoinGecko
+    PAGE_SIZE = 250
+
+    # Price changes that are included in the market entries
+    PRICE_CHANGES = "1h,24h,7d,30d,1y"
+
+    # Key is lower case target currency, value is 'MarketSnapshot'
+    _snapshots = MappingProxyType(dict())
+
+    @staticmethod
+    def refresh(context=None):
+        """Download markets for all target currencies. Currencies
+        that fail keep their previous snapshot"""
+
+        top = MarketCache.get_top()
+        per_page = min(top, MarketCache.PAGE_SIZE)
+
+        for vs_cur in MarketCache.get_vs_currencies():
+            try:
+                coins = list()
+
+                for page in range(1, -(-top // per_page) + 1):
+                    coins.extend(CoinGecko().get_coins_markets(
+                        vs_cur,
+                        per_page=per_page,
+                        page=page,
+                        order="market_cap_desc",
+                        sparkline=False,
+                        price_change_percentage=MarketCache.PRICE_CHANGES))
+
+                coins = tuple(coins[:top])
+                snapshot = MarketSnapshot(
+                    time=time.time(),
+                    coins=coins,
+                    id=MappingProxyType({c["id"]: c for c in coins}))
+
+                # Replace all snapshots at once so that
+                # readers never see a partly updated dict
+                snapshots = dict(MarketCache._snapshots)
+                snapshots[vs_cur] = snapshot
+                MarketCache._snapshots = MappingProxyType(snapshots)
+            except Exception as e:
+                logging.error(f"Can't prefetch markets in {vs_cur.upper()}: {repr(e)}")
+
+    @staticmethod
+    def get_top():
+        return Cfg.get("market_prefetch", "top") or MarketCache.DEF_TOP
+
+    @staticmethod
+    def get_interval():
+        interval = Cfg.get("market_prefetch", "interval")
+        return utl.get_seconds(interval) or MarketCache.DEF_INTERVAL
+
+    @staticmethod
+    def get_vs_currencies():
+        vs_currencies = Cfg.get("market_prefetch", "vs_currencies")
+        vs_currencies = vs_currencies or MarketCache.DEF_VS_CURRENCIES
+        return [cur.lower() for cur in vs_currencies]
+
+    @staticmethod
+    def get_snapshot(vs_currency):
+        """Return snapshot for target currency or None
+        if there is none or if it's too old"""
+
+        if not Cfg.get("market_prefetch", "enabled"):
+            return None
+
+        snapshot = MarketCache._snapshots.get(vs_currency.lower())
+
+        if snapshot is None:
+            return None
+
+        # By default two intervals, so one failed download is fine
+        max_age = Cfg.get("market_prefetch", "max_age") or MarketCache.get_interval() * 2
+
+        if time.time() - snapshot.time > max_age:
+            return None
+
+        return snapshot
+
+    @staticmethod
+    def get_markets(vs_currency, top, order="market_cap_desc"):
+        """Return list of market entries of the top coins (by market cap or
+        by volume if order is 'volume_desc') or None if the snapshot is
+        missing or has less coins. Coins that are only in the top by volume
+        but not in the prefetched top by market cap are missing"""
+
+        snapshot = MarketCache.get_snapshot(vs_currency)
+
+        if snapshot is None or top > len(snapshot.coins):
+            return None
+
+        if order == "volume_desc":
+            coins = sorted(snapshot.coins, key=lambda c: c["total_volume"] or 0, reverse=True)
+            return coins[:top]
+
+        return list(snapshot.coins[:top])
+
+    @staticmethod
+    def get_market(coin_id, vs_currency):
+        """Return market entry of coin or None if it's not in the snapshot"""
+
+        snapshot = MarketCache.get_snapshot(vs_currency)
+
+        if snapshot is None:
+            return None
+
+        return snapshot.id.get(coin_id)
+
+    @staticmethod
+    def get_prices(coin_id, vs_currencies):
+        """Return dict with lower case target currency and price (like the
+        entries of CoinGecko 'simple/price') or None if one is missing"""
+
+        prices = dict()
+
+        for vs_cur in vs_currencies:
+            entry = MarketCache.get_market(coin_id, vs_cur)
+
+            if not entry or entry["current_price"] is None:
+                return None
+
+            prices[vs_cur.lower()] = entry["current_price"]
+
+        return prices
@@ -0,0 +1,41 @@
+import os
+
+from collections import OrderedDict
+from opencryptobot.api.apicache import APICache
+from opencryptobot.api.coingecko import CoinGecko
+from opencryptobot.api.marketcache import MarketCache
+
+
+class PriceService(object):
+    """Prices for many coins with at most one request to CoinGecko"""
+
+    @staticmethod
+    def get_many(symbols, vs_currencies):
+        """Return ordered dict with upper case symbol as key and dict with
+        lower case target currency and price as value. Value is None if
+        the symbol is unknown or CoinGecko has no price for it"""
+
+        coin_ids = OrderedDict()
+        for symbol in symbols:
+            coin_ids[symbol.upper()] = APICache.resolve_symbol(symbol)
+
+        # Prefetched markets don't need a request
+        prices = dict()
+        for coin_id in set(filter(None, coin_ids.values())):
+            cached = MarketCache.get_prices(coin_id, vs_currencies)
+            if cached:
+                prices[coin_id] = cached
+
+        # Sorted so that the same coins always result in the same URL
+        ids = sorted(set(filter(None, coin_ids.values())) - set(prices))
+        vs_cur = ",".join(cur.lower() for cur in vs_currencies)
+
+        if ids:
+            cg = CoinGecko()
+            cg.api_key = os.getenv("COINGECKO_API_KEY")
+            prices.update(cg.get_simple_price(",".join(ids), vs_cur))
+
+        result = OrderedDict()
+        for symbol, coin_id in coin_ids.items():
+            result[symbol] = prices.get(coin_id) if coin_id else None
+        return result
@@ -0,0 +1,164 @@
+import re
+import time
+import threading
+
+from collections import OrderedDict
+from opencryptobot.config import ConfigManager as Cfg
+
+
+class _Flight(object):
+    """Upstream request that is currently in progress"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.response = None
+        self.error = None
+
+    def wait(self):
+        self.event.wait()
+        if self.error:
+            raise self.error
+        return self.response
+
+
+class ResponseCache(object):
+    """TTL cache for API responses, keyed on the full request URL.
+    Concurrent misses for the same URL share one upstream request"""
+
+    DEF_MAX_ENTRIES = 1000
+
+    # Regex that is searched in the request URL and time to live in
+    # seconds. First match wins, URLs without a match aren't cached
+    DEF_TTL = (
+        # CoinGecko
+        (r"api\.coingecko\.com/.*/simple/price", 10),
+        (r"api\.coingecko\.com/.*/coins/markets", 30),
+        (r"api\.coingecko\.com/.*/market_chart", 60),
+        (r"api\.coingecko\.com/.*/coins/list", 300),
+        (r"api\.coingecko\.com/.*/coins/[^/?]+/history", 3600),
+        (r"api\.coingecko\.com/.*/coins/[^/?]+/?(\?|$)", 60),
+        (r"api\.coingecko\.com/.*/exchange_rates", 60),
+        (r"api\.coingecko\.com/.*/global", 60),
+        (r"api\.coingecko\.com/.*/exchanges", 300),
+        (r"api\.coingecko\.com/.*/events", 3600),
+        # CryptoCompare
+        (r"min-api\.cryptocompare\.com/.*/histominute", 30),
+        (r"min-api\.cryptocompare\.com/.*/histohour", 60),
+        (r"min-api\.cryptocompare\.com/.*/histoday", 300),
+        (r"min-api\.cryptocompare\.com/.*/coin/generalinfo", 3600),
+        (r"min-api\.cryptocompare\.com/.*/(wallets|mining/pools)/general", 3600),
+        # CoinPaprika
+        (r"api\.coinpaprika\.com/.*/ohlcv/", 300),
+        (r"api\.coinpaprika\.com/.*/global", 60),
+        (r"api\.coinpaprika\.com/.*/(coins|people)", 3600),
+        # Others
+        (r"cryptopanic\.com/api/", 120),
+        (r"tokenstats\.io/api/", 600),
+        (r"crypto51\.app/", 600),
+        (r"arewedecentralizedyet\.com/", 600),
+    )
+
+    _entries = OrderedDict()
+    _pending = dict()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get(url, fetch):
+        """Return cached response for URL or call 'fetch(url)' to get it"""
+
+        ttl = ResponseCache.get_ttl(url)
+
+        if not ttl:
+            return fetch(url)
+
+        now = time.monotonic()
+
+        with ResponseCache._lock:
+            entry = ResponseCache._entries.get(url)
+
+            if entry and entry[0] > now:
+                ResponseCache._entries.move_to_end(url)
+                return entry[1]
+
+            flight = ResponseCache._pending.get(url)
+
+            if flight:
+                owner = False
+            else:
+                owner = True
+                flight = _Flight()
+                ResponseCache._pending[url] = flight
+
+        # Same request already in progress - wait for its result
+        if not owner:
+            return flight.wait()
+
+        try:
+            flight.response = fetch(url)
+        except Exception as e:
+            flight.error = e
+            raise e
+        finally:
+            with ResponseCache._lock:
+                del ResponseCache._pending[url]
+
+                # Only keep successful responses
+                if flight.response is not None and flight.response.ok:
+                    ResponseCache._store(url, flight.response, now + ttl)
+
+            flight.event.set()
+
+        return flight.response
+
+    @staticmethod
+    def get_ttl(url):
+        """Return time to live in seconds for response of URL"""
+
+        if not Cfg.get("response_cache", "enabled"):
+            return 0
+
+        cfg_ttl = Cfg.get("response_cache", "ttl") or dict()
+
+        for pattern, ttl in list(cfg_ttl.items()) + list(ResponseCache.DEF_TTL):
+            if re.search(pattern, url):
+                return ttl
+        return 0
+
+    @staticmethod
+    def lookup(url):
+        """Return cached response for URL or None if there is none"""
+
+        with ResponseCache._lock:
+            entry = ResponseCache._entries.get(url)
+
+            if entry and entry[0] > time.monotonic():
+                ResponseCache._entries.move_to_end(url)
+                return entry[1]
+        return None
+
+    @staticmethod
+    def put(url, response):
+        """Cache response for URL if it was successful"""
+
+        ttl = ResponseCache.get_ttl(url)
+
+        if ttl and response.ok:
+            with ResponseCache._lock:
+                ResponseCache._store(url, response, time.monotonic() + ttl)
+
+    @staticmethod
+    def clear():
+        with ResponseCache._lock:
+            ResponseCache._entries.clear()
+
+    @staticmethod
+    def _store(url, response, expires):
+        max_entries = Cfg.get("response_cache", "max_entries")
+        max_entries = max_entries or ResponseCache.DEF_MAX_ENTRIES
+
+        ResponseCache._entries[url] = (expires, response)
+        ResponseCache._entries.move_to_end(url)
+
+        # Remove least recently used entries
+        while len(ResponseCache._entries) > max_entries:
+            ResponseCache._entries.popitem(last=False)
@@ -1,5 +1,8 @@
 import json
-import requests
+
+from opencryptobot.metrics import Metrics
+from opencryptobot.api.transport import Transport
+from opencryptobot.api.responsecache import ResponseCache
 
 
 class TokenStats(object):
@@ -12,9 +15,10 @@ class TokenStats(object):
         if url:
             self._base_url = url
 
+    @Metrics.api_request
     def _request(self, url):
         try:
-            self.response = requests.get(url)
+            self.response = ResponseCache.get(url, Transport.get)
             self.response.raise_for_status()
             return json.loads(self.response.content.decode('utf-8'))
         except Exception as e:
@@ -0,0 +1,95 @@
+import time
+import threading
+import requests
+
+from urllib.parse import urlsplit
+from urllib3.util.retry import Retry
+from requests.adapters import HTTPAdapter
+from opencryptobot.metrics import Metrics
+from opencryptobot.config import ConfigManager as Cfg
+
+
+class Transport(object):
+    """Shared HTTP session with keep-alive connection pools per host"""
+
+    DEF_POOL_SIZE = 10  # Connections per host
+    DEF_POOL_HOSTS = 20  # Number of hosts to keep pools for
+    DEF_RETRIES = 3
+    DEF_BACKOFF = 0.5  # In seconds
+    DEF_TIMEOUT = 30  # In seconds
+
+    # Retry on these status codes (server errors). Rate limits (429)
+    # aren't retried, more requests would only make them worse
+    RETRY_STATUS = (500, 502, 503, 504)
+
+    _session = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get(url, timeout=None, **kwargs):
+        """Send GET request over the shared session and return the response"""
+
+        if timeout is None:
+            timeout = Transport.get_timeout(url)
+
+        start = time.monotonic()
+
+        try:
+            response = Transport.get_session().get(url, timeout=timeout, **kwargs)
+        except Exception:
+            Metrics.upstream(url, time.monotonic() - start, "error")
+            raise
+
+        Metrics.upstream(url, time.monotonic() - start, response.status_code)
+        return response
+
+    @staticmethod
+    def get_session():
+        if Transport._session is None:
+            with Transport._lock:
+                if Transport._session is None:
+                    Transport._session = Transport._create_session()
+        return Transport._session
+
+    @staticmethod
+    def get_timeout(url):
+        """Return timeout for host of URL. Falls back to general timeout"""
+
+        host = urlsplit(url).hostname
+        host_timeout = Cfg.get("http", "host_timeout") or dict()
+
+        if host in host_timeout:
+            return host_timeout[host]
+
+        return Cfg.get("http", "timeout") or Transport.DEF_TIMEOUT
+
+    @staticmethod
+    def close():
+        with Transport._lock:
+            if Transport._session is not None:
+                Transport._session.close()
+                Transport._session = None
+
+    @staticmethod
+    def _create_session():
+        pool_size = Cfg.get("http", "pool_size") or Transport.DEF_POOL_SIZE
+        retries = Cfg.get("http", "retries")
+        backoff = Cfg.get("http", "backoff")
+
+        retry = Retry(
+            total=Transport.DEF_RETRIES if retries is None else retries,
+            backoff_factor=Transport.DEF_BACKOFF if backoff is None else backoff,
+            status_forcelist=Transport.RETRY_STATUS,
+            allowed_methods=frozenset(["GET"]),
+            respect_retry_after_header=False,
+            raise_on_status=False)
+
+        adapter = HTTPAdapter(
+            pool_connections=Transport.DEF_POOL_HOSTS,
+            pool_maxsize=pool_size,
+            max_retries=retry)
+
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
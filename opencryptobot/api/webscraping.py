@@ -1,6 +1,7 @@
 import requests
 
 from bs4 import BeautifulSoup
+from opencryptobot.api.transport import Transport
 
 COIN_PAPRIKA_PARTIAL = "https://coinpaprika.com/coin/"
 CMC_URL_PARTIAL = "https://coinmarketcap.com/currencies/"
@@ -14,7 +15,7 @@ def return_response_content(response: requests.Response):
 
 def get_wp_allcryptowhitepaper(name):
     url = f"{ALL_CRYPTO_WP_PARTIAL}{name}-Whitepaper"
-    content = return_response_content(requests.get(url))
+    content = return_response_content(Transport.get(url))
     soup = BeautifulSoup(content, "html.parser")
     for entry_content in soup.find_all(class_="entry-content"):
         for p in entry_content.find_all("p"):
@@ -25,7 +26,7 @@ def get_wp_allcryptowhitepaper(name):
 
 def get_wp_coinmarketcap(slug):
     url = f"{CMC_URL_PARTIAL}{slug}"
-    content = return_response_content(requests.get(url))
+    content = return_response_content(Transport.get(url))
     soup = BeautifulSoup(content, "html.parser")
     for links in soup.find_all(class_="list-unstyled details-panel-item--links"):
         for li in links.find_all("li"):
@@ -36,7 +37,7 @@ def get_wp_coinmarketcap(slug):
 
 def get_wp_coinpaprika(coin_id):
     url = f"{COIN_PAPRIKA_PARTIAL}{coin_id}"
-    content = return_response_content(requests.get(url))
+    content = return_response_content(Transport.get(url))
     soup = BeautifulSoup(content, "html.parser")
     for link in soup.find_all(class_="cp-details__whitepaper-link"):
         return link["href"]
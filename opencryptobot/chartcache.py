@@ -0,0 +1,132 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+
+from collections import OrderedDict
+from opencryptobot.config import ConfigManager as Cfg
+
+
+class ChartCache:
+    """Rendered charts (image or document as bytes) in memory with LRU
+    eviction. Evicted charts can be spilled to disk. Keys contain a time
+    bucket aligned to the granularity of the chart data, so a chart is
+    reused until its data would get a new data point"""
+
+    DEF_MAX_ENTRIES = 100
+    DEF_MAX_DISK_ENTRIES = 1000
+
+    _entries = OrderedDict()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def key(granularity, *parts):
+        """Return cache key for chart with given parts (command, coin,
+        base coin, time frame, ...) and data granularity in seconds"""
+
+        bucket = int(time.time() // granularity)
+        return tuple(str(p).upper() for p in parts) + (granularity, bucket)
+
+    @staticmethod
+    def get(key):
+        """Return cached chart for key or None"""
+
+        if not Cfg.get("chart_cache", "enabled"):
+            return None
+
+        with ChartCache._lock:
+            if key in ChartCache._entries:
+                ChartCache._entries.move_to_end(key)
+                return ChartCache._entries[key]
+
+        return ChartCache._read_disk(key)
+
+    @staticmethod
+    def put(key, chart):
+        if not Cfg.get("chart_cache", "enabled"):
+            return
+
+        max_entries = Cfg.get("chart_cache", "max_entries")
+        max_entries = max_entries or ChartCache.DEF_MAX_ENTRIES
+
+        evicted = list()
+
+        with ChartCache._lock:
+            ChartCache._entries[key] = chart
+            ChartCache._entries.move_to_end(key)
+
+            # Remove least recently used charts
+            while len(ChartCache._entries) > max_entries:
+                evicted.append(ChartCache._entries.popitem(last=False))
+
+        for old_key, old_chart in evicted:
+            # Charts of old buckets will never be requested again
+            if old_key[-1] == int(time.time() // old_key[-2]):
+                ChartCache._write_disk(old_key, old_chart)
+
+    @staticmethod
+    def clear():
+        with ChartCache._lock:
+            ChartCache._entries.clear()
+
+    @staticmethod
+    def _get_file(key):
+        disk_dir = Cfg.get("chart_cache", "disk_dir")
+
+        if not disk_dir:
+            return None
+
+        name = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(disk_dir, name)
+
+    @staticmethod
+    def _read_disk(key):
+        file = ChartCache._get_file(key)
+
+        if not file or not os.path.isfile(file):
+            return None
+
+        try:
+            with open(file, "rb") as f:
+                chart = f.read()
+        except OSError:
+            return None
+
+        # Move chart back to memory
+        ChartCache.put(key, chart)
+        return chart
+
+    @staticmethod
+    def _write_disk(key, chart):
+        file = ChartCache._get_file(key)
+
+        if not file:
+            return
+
+        try:
+            disk_dir = os.path.dirname(file)
+            os.makedirs(disk_dir, exist_ok=True)
+
+            with open(file, "wb") as f:
+                f.write(chart)
+
+            ChartCache._prune_disk(disk_dir)
+        except OSError as e:
+            logging.warning(f"Can't spill chart to disk: {repr(e)}")
+
+    @staticmethod
+    def _prune_disk(disk_dir):
+        max_entries = Cfg.get("chart_cache", "max_disk_entries")
+        max_entries = max_entries or ChartCache.DEF_MAX_DISK_ENTRIES
+
+        files = [e for e in os.scandir(disk_dir) if e.is_file()]
+
+        if len(files) <= max_entries:
+            return
+
+        # Remove oldest files first
+        files.sort(key=lambda e: e.stat().st_mtime)
+
+        for entry in files[:len(files) - max_entries]:
+            os.remove(entry.path)
@@ -24,6 +24,7 @@ BPMN_DIR = os.path.join(RES_DIR, "bpmn")
 
 SRC_DIR = "opencryptobot"
 PLG_DIR = "plugins"
+PLG_MANIFEST = "manifest.json"
 
 MAX_TG_MSG_LEN = 4096
 CG_DATA_LIMIT = 2000
@@ -1,14 +1,25 @@
 import os
 import zlib
+import time
+import queue
 import pickle
 import sqlite3
-import inspect
+import logging
+import threading
 import opencryptobot.emoji as emo
-import opencryptobot.constants as c
+
+from opencryptobot.config import ConfigManager as Cfg
+from opencryptobot.sqlmanager import SQLManager
 
 
 class Database:
 
+    # Defaults for logging of command usage
+    DEF_QUEUE_SIZE = 10000  # Max number of not yet saved commands
+    DEF_BATCH_SIZE = 200  # Max number of commands saved in one transaction
+    DEF_FLUSH_INTERVAL = 2  # Max seconds until a command is saved
+    DEF_MAX_MEDIA = 10000  # Max number of saved file_ids of media
+
     # Initialize database
     def __init__(self, db_path="data.db"):
         self._db_path = db_path
@@ -17,29 +28,29 @@ class Database:
         data_dir = os.path.dirname(db_path)
         os.makedirs(data_dir, exist_ok=True)
 
-        con = sqlite3.connect(db_path)
-        cur = con.cursor()
-
-        # If tables don't exist, create them
-        if not cur.execute(self.get_sql("db_exists")).fetchone():
-            cur.execute(self.get_sql("users"))
-            con.commit()
-            cur.execute(self.get_sql("chats"))
-            con.commit()
-            cur.execute(self.get_sql("repeaters"))
-            con.commit()
-            cur.execute(self.get_sql("cmd_data"))
-            con.commit()
-
-            con.close()
-
-        # SQL - Check if user exists
-        self.usr_exist_sql = self.get_sql("user_exists")
-        # SQL - Check if chat exists
-        self.cht_exist_sql = self.get_sql("chat_exists")
-        # SQL - Add user
+        # One connection for the lifetime of the bot. Handlers run in
+        # different threads so every access is serialized by the lock
+        self._con = self._connect(db_path)
+        self._lock = threading.RLock()
+
+        with self._lock, self._con as con:
+            cur = con.cursor()
+
+            # If tables don't exist, create them
+            if not cur.execute(self.get_sql("db_exists")).fetchone():
+                cur.execute(self.get_sql("users"))
+                cur.execute(self.get_sql("chats"))
+                cur.execute(self.get_sql("repeaters"))
+                cur.execute(self.get_sql("cmd_data"))
+
+            # Tables that were added later and might be missing
+            cur.execute(self.get_sql("whitepapers"))
+            cur.execute(self.get_sql("media"))
+            cur.execute(self.get_sql("media_index"))
+
+        # SQL - Add user if he doesn't exist
         self.add_usr_sql = self.get_sql("user_add")
-        # SQL - Add chat
+        # SQL - Add chat if it doesn't exist
         self.add_cht_sql = self.get_sql("chat_add")
         # SQL - Read chat
         self.read_cht_sql = self.get_sql("read_chat")
@@ -55,80 +66,159 @@ class Database:
         self.save_rep_sql = self.get_sql("rep_save")
         # SQL - Delete repeating command
         self.delete_rep_sql = self.get_sql("rep_delete")
+        # SQL - Read whitepaper
+        self.read_wp_sql = self.get_sql("wp_read")
+        # SQL - Save whitepaper
+        self.save_wp_sql = self.get_sql("wp_save")
+        # SQL - Read file_id of media
+        self.read_media_sql = self.get_sql("media_read")
+        # SQL - Save file_id of media
+        self.save_media_sql = self.get_sql("media_save")
+        # SQL - Delete oldest file_ids of media
+        self.delete_media_sql = self.get_sql("media_delete")
+
+        # Issued commands that the writer thread will save
+        queue_size = Cfg.get("database", "queue_size")
+        self._usage = queue.Queue(queue_size or self.DEF_QUEUE_SIZE)
+        self._dropped = 0
+
+        self._writer = threading.Thread(target=self._write_usage, name="UsageWriter")
+        self._writer.daemon = True
+        self._writer.start()
+
+    # Open connection that can be shared between threads
+    def _connect(self, db_path):
+        con = sqlite3.connect(db_path, check_same_thread=False)
+
+        # Readers don't block the writer and the other way around
+        con.execute("PRAGMA journal_mode=WAL")
+        # Safe in WAL mode, only syncs on checkpoints
+        con.execute("PRAGMA synchronous=NORMAL")
+
+        return con
+
+    # Save pending commands and close connection to database
+    def close(self):
+        self._usage.put(None)
+        self._writer.join()
+
+        with self._lock:
+            self._con.close()
 
     # Get string with SQL statement from file
     def get_sql(self, filename):
-        cls = inspect.stack()[1][0].f_locals["self"].__class__
-        cls_name = cls.__name__.lower()
-        filename = f"{filename}.sql"
-
-        with open(os.path.join(c.SQL_DIR, cls_name, filename)) as f:
-            return f.read()
+        return SQLManager.get(type(self).__name__.lower(), filename)
 
     # Save user and / or chat to database
     def save_usr_and_cht(self, user, chat):
-        con = sqlite3.connect(self._db_path)
-        cur = con.cursor()
+        with self._lock, self._con as con:
+            return self._save_usr_and_cht(con.cursor(), user, chat)
 
-        # Check if user already exists
+    # Add user and chat if they don't exist. Doesn't commit
+    def _save_usr_and_cht(self, cur, user, chat):
         cur.execute(
-            self.usr_exist_sql,
-            [user.id])
-
-        con.commit()
-
-        # Add user if he doesn't exist
-        if cur.fetchone()[0] != 1:
-            cur.execute(
-                self.add_usr_sql,
-                [user.id,
-                 user.first_name,
-                 user.last_name,
-                 user.username,
-                 user.language_code])
-
-            con.commit()
+            self.add_usr_sql,
+            [user.id,
+             user.first_name,
+             user.last_name,
+             user.username,
+             user.language_code])
 
         chat_id = None
 
         if chat and chat.id != user.id:
             chat_id = chat.id
 
-            # Check if chat already exists
             cur.execute(
-                self.cht_exist_sql,
-                [chat.id])
+                self.add_cht_sql,
+                [chat.id,
+                 chat.type,
+                 chat.title,
+                 chat.username])
 
-            con.commit()
-
-            # Add chat if it doesn't exist
-            if cur.fetchone()[0] != 1:
-                cur.execute(
-                    self.add_cht_sql,
-                    [chat.id,
-                     chat.type,
-                     chat.title,
-                     chat.username])
-
-                con.commit()
-
-        con.close()
         return {"user_id": user.id, "chat_id": chat_id}
 
     # Save issued commands to database
     def save_cmd(self, usr, cht, cmd):
-        ids = self.save_usr_and_cht(usr, cht)
+        with self._lock, self._con as con:
+            cur = con.cursor()
 
-        con = sqlite3.connect(self._db_path)
-        cur = con.cursor()
+            ids = self._save_usr_and_cht(cur, usr, cht)
 
-        # Save issued command
-        cur.execute(
-            self.save_cmd_sql,
-            [ids["user_id"], ids["chat_id"], cmd])
+            # Save issued command
+            cur.execute(
+                self.save_cmd_sql,
+                [ids["user_id"], ids["chat_id"], cmd])
 
-        con.commit()
-        con.close()
+    # Queue issued command to be saved by the writer thread. Doesn't
+    # wait for the database. If the queue is full, the command will
+    # be dropped or - if 'queue_full' is 'block' - the caller waits
+    def log_cmd(self, usr, cht, cmd):
+        usr_row = [usr.id, usr.first_name, usr.last_name, usr.username, usr.language_code]
+
+        cht_row = None
+        if cht and cht.id != usr.id:
+            cht_row = [cht.id, cht.type, cht.title, cht.username]
+
+        cmd_row = [usr.id, cht_row[0] if cht_row else None, cmd]
+
+        try:
+            if Cfg.get("database", "queue_full") == "block":
+                self._usage.put((usr_row, cht_row, cmd_row))
+            else:
+                self._usage.put_nowait((usr_row, cht_row, cmd_row))
+        except queue.Full:
+            self._dropped += 1
+
+    # Writer thread that saves queued commands in batches
+    def _write_usage(self):
+        running = True
+
+        while running:
+            batch_size = Cfg.get("database", "batch_size") or self.DEF_BATCH_SIZE
+            interval = Cfg.get("database", "flush_interval") or self.DEF_FLUSH_INTERVAL
+
+            # Wait for first command, then collect more until
+            # batch is full or flush interval is over
+            batch = [self._usage.get()]
+            deadline = time.monotonic() + interval
+
+            while batch[-1] is not None and len(batch) < batch_size:
+                timeout = deadline - time.monotonic()
+
+                try:
+                    if timeout > 0:
+                        batch.append(self._usage.get(timeout=timeout))
+                    else:
+                        batch.append(self._usage.get_nowait())
+                except queue.Empty:
+                    break
+
+            # 'None' is the signal to stop after saving the batch
+            if batch[-1] is None:
+                running = False
+                batch.pop()
+
+            if batch:
+                self._save_usage(batch)
+
+            if self._dropped:
+                logging.warning(f"Usage queue full - {self._dropped} commands not saved")
+                self._dropped = 0
+
+    # Save a batch of issued commands in one transaction
+    def _save_usage(self, batch):
+        usr_rows = [usr_row for usr_row, _, _ in batch]
+        cht_rows = [cht_row for _, cht_row, _ in batch if cht_row]
+        cmd_rows = [cmd_row for _, _, cmd_row in batch]
+
+        try:
+            with self._lock, self._con as con:
+                con.executemany(self.add_usr_sql, usr_rows)
+                con.executemany(self.add_cht_sql, cht_rows)
+                con.executemany(self.save_cmd_sql, cmd_rows)
+        except Exception as e:
+            logging.error(f"Can't save usage of {len(batch)} commands: {e}")
 
     # Save new repeater to database
     def save_rep(self, update, interval):
@@ -143,36 +233,32 @@ class Database:
         else:
             raise Exception("Not possible to save repeater")
 
-        ids = self.save_usr_and_cht(usr, cht)
         upd = zlib.compress(pickle.dumps(update))
 
-        con = sqlite3.connect(self._db_path)
-        cur = con.cursor()
+        with self._lock, self._con as con:
+            cur = con.cursor()
 
-        # Save msg to be repeated
-        cur.execute(
-            self.save_rep_sql,
-            [ids["user_id"], ids["chat_id"], cmd, interval, upd])
+            ids = self._save_usr_and_cht(cur, usr, cht)
 
-        con.commit()
-        con.close()
+            # Save msg to be repeated
+            cur.execute(
+                self.save_rep_sql,
+                [ids["user_id"], ids["chat_id"], cmd, interval, upd])
 
     # Read repeaters from database
     def read_rep(self, user_id=None, chat_id=None):
-        con = sqlite3.connect(self._db_path)
-        cur = con.cursor()
-
-        if user_id:
-            if user_id == chat_id or chat_id is None:
-                cur.execute(self.read_rep_usr_sql, [user_id])
+        with self._lock:
+            cur = self._con.cursor()
+
+            if user_id:
+                if user_id == chat_id or chat_id is None:
+                    cur.execute(self.read_rep_usr_sql, [user_id])
+                else:
+                    cur.execute(self.read_rep_sql, [user_id, chat_id])
             else:
-                cur.execute(self.read_rep_sql, [user_id, chat_id])
-        else:
-            cur.execute(self.read_rep_all_sql)
-
-        con.commit()
+                cur.execute(self.read_rep_all_sql)
 
-        result = cur.fetchall()
+            result = cur.fetchall()
 
         results = list()
         for repeater in result:
@@ -181,51 +267,85 @@ class Database:
 
             results.append(rep)
 
-        con.close()
         return results
 
     # Delete repeaters from database
     def delete_rep(self, repeater_id):
-        con = sqlite3.connect(self._db_path)
-        cur = con.cursor()
-
-        cur.execute(
-            self.delete_rep_sql,
-            [repeater_id])
-
-        con.commit()
-        con.close()
+        with self._lock, self._con as con:
+            con.execute(
+                self.delete_rep_sql,
+                [repeater_id])
 
     # Read chat by chat_id
     def read_chat(self, chat_id):
-        con = sqlite3.connect(self._db_path)
-        cur = con.cursor()
-
-        cur.execute(self.read_cht_sql, [chat_id])
-        con.commit()
-
-        result = cur.fetchall()
-
-        con.close()
+        with self._lock:
+            result = self._con.execute(self.read_cht_sql, [chat_id]).fetchall()
 
         if result:
             return list(result[0])
 
         return None
 
+    # Read name and link of whitepaper for a symbol
+    def read_wp(self, symbol):
+        with self._lock:
+            return self._con.execute(self.read_wp_sql, [symbol]).fetchone()
+
+    # Save whitepaper for a symbol
+    def save_wp(self, symbol, name, link):
+        with self._lock, self._con as con:
+            con.execute(
+                self.save_wp_sql,
+                [symbol, name, link])
+
+    # Read Telegram file_id for hash of media content
+    def read_media(self, content_hash):
+        with self._lock:
+            result = self._con.execute(self.read_media_sql, [content_hash]).fetchone()
+
+        return result[0] if result else None
+
+    # Save Telegram file_id for hash of media content. Every
+    # chart has a new hash, so only the newest ones are kept
+    def save_media(self, content_hash, file_id):
+        max_media = Cfg.get("database", "max_media") or self.DEF_MAX_MEDIA
+
+        with self._lock, self._con as con:
+            con.execute(
+                self.save_media_sql,
+                [content_hash, file_id])
+            con.execute(
+                self.delete_media_sql,
+                [max_media])
+
+    # Check if database can be queried. Doesn't wait
+    # longer than 'timeout' seconds for other queries
+    def ping(self, timeout=5):
+        if not self._lock.acquire(timeout=timeout):
+            return False
+
+        try:
+            self._con.execute(self.get_sql("ping")).fetchone()
+            return True
+        except Exception as e:
+            logging.error(f"Can't query database: {e}")
+            return False
+        finally:
+            self._lock.release()
+
     # Execute raw SQL statements on database
     def execute_sql(self, sql, *args):
         dic = {"result": None, "error": None}
 
-        con = sqlite3.connect(self._db_path)
-        cur = con.cursor()
+        with self._lock:
+            cur = self._con.cursor()
 
-        try:
-            cur.execute(sql, args)
-            con.commit()
-            dic["result"] = cur.fetchall()
-        except Exception as e:
-            dic["error"] = f"{emo.ERROR} {e}"
+            try:
+                cur.execute(sql, args)
+                self._con.commit()
+                dic["result"] = cur.fetchall()
+            except Exception as e:
+                self._con.rollback()
+                dic["error"] = f"{emo.ERROR} {e}"
 
-        con.close()
         return dic
@@ -0,0 +1,81 @@
+import json
+
+from opencryptobot.api.apicache import APICache
+from opencryptobot.config import ConfigManager as Cfg
+
+
+class HealthCheck:
+    """Liveness and readiness of the bot for the status server. The bot
+    is live if it processes updates. It's ready if it's live, plugins are
+    loaded, the coin list is cached, the database can be queried, jobs
+    are running and not too many updates are waiting"""
+
+    CONTENT_TYPE = "application/json"
+
+    DEF_MAX_QUEUE = 100  # Max number of waiting updates
+    DB_TIMEOUT = 5  # In seconds
+
+    # Datasets that have to be cached. Others are only reported
+    REQUIRED_DATASETS = ("cg_coin_list",)
+
+    def __init__(self, telegram_bot, db):
+        self.tgb = telegram_bot
+        self.db = db
+
+    def is_live(self):
+        return self.tgb.dispatcher.running
+
+    def get_checks(self):
+        """Return dict with name of check and dict with result
+        ('ok') and details. All checks have to be ok to be ready"""
+
+        checks = dict()
+
+        checks["plugins"] = {
+            "ok": len(self.tgb.plugins) > 0,
+            "loaded": len(self.tgb.plugins)}
+
+        if Cfg.get("refresh_cache") is None:
+            checks["api_cache"] = {"ok": True, "enabled": False}
+        else:
+            ages = {name: APICache.get_age(name) for name in APICache.DATASETS}
+            checks["api_cache"] = {
+                "ok": all(ages[name] is not None for name in HealthCheck.REQUIRED_DATASETS),
+                "age": {n: None if a is None else round(a) for n, a in ages.items()}}
+
+        checks["database"] = {"ok": self.db.ping(timeout=HealthCheck.DB_TIMEOUT)}
+
+        checks["job_queue"] = {"ok": self.tgb.job_queue.scheduler.running}
+
+        max_queue = Cfg.get("status_server", "max_queue") or HealthCheck.DEF_MAX_QUEUE
+        queue = self.tgb.dispatcher.update_queue.qsize()
+
+        checks["dispatcher"] = {
+            "ok": self.tgb.dispatcher.running and queue <= max_queue,
+            "queue": queue}
+
+        return checks
+
+    def respond_health(self):
+        """Handler for liveness. Status is 200 if live. Checks are not
+        run, a slow one (like the database) must not restart the bot"""
+
+        live = self.is_live()
+        body = {"status": "ok" if live else "fail", "live": live}
+
+        return 200 if live else 503, HealthCheck.CONTENT_TYPE, json.dumps(body)
+
+    def respond_ready(self):
+        """Handler for readiness. Status is 200 only if ready, checks are included"""
+
+        live = self.is_live()
+        checks = self.get_checks()
+        ready = live and all(check["ok"] for check in checks.values())
+
+        body = {
+            "status": "ok" if ready else "fail",
+            "live": live,
+            "ready": ready,
+            "checks": checks}
+
+        return 200 if ready else 503, HealthCheck.CONTENT_TYPE, json.dumps(body)
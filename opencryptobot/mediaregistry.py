@@ -0,0 +1,88 @@
+import hashlib
+import logging
+import threading
+
+from io import BytesIO
+from collections import OrderedDict
+from telegram.error import BadRequest
+from opencryptobot.config import ConfigManager as Cfg
+
+
+class MediaRegistry:
+    """Remembers the Telegram 'file_id' of uploaded photos and documents by
+    hash of their content. Identical content is sent by 'file_id' instead
+    of being uploaded again. Saved in the database if it's enabled"""
+
+    DEF_MAX_ENTRIES = 1000
+
+    _file_ids = OrderedDict()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def reply_photo(db, message, content, **kwargs):
+        """Reply to message with photo (bytes) and return sent message"""
+
+        return MediaRegistry._reply(
+            db, message.reply_photo, "photo", content, lambda m: m.photo[-1].file_id, **kwargs)
+
+    @staticmethod
+    def reply_document(db, message, content, filename, **kwargs):
+        """Reply to message with document (bytes) and return sent message"""
+
+        return MediaRegistry._reply(
+            db, message.reply_document, "document", content, lambda m: m.document.file_id,
+            filename=filename, **kwargs)
+
+    @staticmethod
+    def _reply(db, reply, arg, content, get_file_id, **kwargs):
+        content_hash = hashlib.sha256(content).hexdigest()
+        file_id = MediaRegistry._get(db, content_hash)
+
+        if file_id:
+            try:
+                return reply(**{arg: file_id}, **kwargs)
+            except BadRequest as e:
+                # File isn't available on Telegram anymore
+                logging.warning(f"Can't send {arg} by file_id: {e}")
+
+        msg = reply(**{arg: BytesIO(content)}, **kwargs)
+
+        try:
+            MediaRegistry._set(db, content_hash, get_file_id(msg))
+        except Exception as e:
+            logging.error(f"Can't save file_id: {repr(e)}")
+
+        return msg
+
+    @staticmethod
+    def _get(db, content_hash):
+        with MediaRegistry._lock:
+            if content_hash in MediaRegistry._file_ids:
+                MediaRegistry._file_ids.move_to_end(content_hash)
+                return MediaRegistry._file_ids[content_hash]
+
+        if not Cfg.get("database", "use_db"):
+            return None
+
+        file_id = db.read_media(content_hash)
+
+        if file_id:
+            MediaRegistry._remember(content_hash, file_id)
+
+        return file_id
+
+    @staticmethod
+    def _set(db, content_hash, file_id):
+        MediaRegistry._remember(content_hash, file_id)
+
+        if Cfg.get("database", "use_db"):
+            db.save_media(content_hash, file_id)
+
+    @staticmethod
+    def _remember(content_hash, file_id):
+        with MediaRegistry._lock:
+            MediaRegistry._file_ids[content_hash] = file_id
+            MediaRegistry._file_ids.move_to_end(content_hash)
+
+            while len(MediaRegistry._file_ids) > MediaRegistry.DEF_MAX_ENTRIES:
+                MediaRegistry._file_ids.popitem(last=False)
@@ -0,0 +1,273 @@
+import sys
+import time
+import bisect
+import inspect
+import threading
+import functools
+
+from types import MappingProxyType
+from urllib.parse import urlsplit
+from opencryptobot.config import ConfigManager as Cfg
+
+
+class Metrics:
+    """Latency histograms and counters for commands, requests of API
+    clients and requests that reach the API provider (upstream). Can be
+    rendered in the Prometheus text format or as a short summary"""
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    # Upper bounds of histogram buckets in seconds
+    BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+    # Type and help text of every metric
+    METRICS = MappingProxyType({
+        "opencryptobot_command_duration_seconds":
+            ("histogram", "Time to handle a command"),
+        "opencryptobot_command_errors_total":
+            ("counter", "Commands that raised or reported an error"),
+        "opencryptobot_api_request_duration_seconds":
+            ("histogram", "Time of requests of API clients, including cached responses"),
+        "opencryptobot_api_request_errors_total":
+            ("counter", "Requests of API clients that failed"),
+        "opencryptobot_upstream_request_duration_seconds":
+            ("histogram", "Time of requests that reached the API provider"),
+        "opencryptobot_upstream_requests_total":
+            ("counter", "Requests that reached the API provider by command and status")
+    })
+
+    # Key is tuple of metric name and labels (tuple of name and value
+    # pairs). Value of histograms is a list of bucket counts (last
+    # one is '+Inf'), sum and count
+    _counters = dict()
+    _histograms = dict()
+    _lock = threading.Lock()
+
+    # Command that is handled in the current thread
+    _local = threading.local()
+
+    @staticmethod
+    def is_enabled():
+        return bool(Cfg.get("metrics", "enabled"))
+
+    @staticmethod
+    def inc(name, labels, value=1):
+        key = (name, labels)
+
+        with Metrics._lock:
+            Metrics._counters[key] = Metrics._counters.get(key, 0) + value
+
+    @staticmethod
+    def observe(name, labels, seconds):
+        key = (name, labels)
+
+        with Metrics._lock:
+            histogram = Metrics._histograms.get(key)
+
+            if histogram is None:
+                histogram = [[0] * (len(Metrics.BUCKETS) + 1), 0.0, 0]
+                Metrics._histograms[key] = histogram
+
+            histogram[0][bisect.bisect_left(Metrics.BUCKETS, seconds)] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+
+    # Decorators and hooks -------------------------------
+
+    @staticmethod
+    def command(func):
+        """Decorator for 'get_action' of plugins. Label is the plugin name"""
+
+        @functools.wraps(func)
+        def _command(self, *args, **kwargs):
+            if not Metrics.is_enabled():
+                return func(self, *args, **kwargs)
+
+            labels = (("command", self.get_name()),)
+
+            # Commands can execute other commands (repeat)
+            outer = getattr(Metrics._local, "command", None)
+            Metrics._local.command = labels[0][1]
+
+            start = time.monotonic()
+
+            try:
+                return func(self, *args, **kwargs)
+            except Exception:
+                Metrics.inc("opencryptobot_command_errors_total", labels)
+                raise
+            finally:
+                Metrics._local.command = outer
+                Metrics.observe("opencryptobot_command_duration_seconds", labels, time.monotonic() - start)
+
+        return _command
+
+    @staticmethod
+    def command_error(plugin):
+        """Count an error that a plugin handled itself"""
+
+        if Metrics.is_enabled():
+            Metrics.inc("opencryptobot_command_errors_total", (("command", plugin.get_name()),))
+
+    @staticmethod
+    def api_request(func):
+        """Decorator for '_request' of API clients. Labels are the
+        class of the client and the method that calls '_request'"""
+
+        if inspect.iscoroutinefunction(func):
+            # Labels are taken when called, the caller is gone once it's awaited
+            @functools.wraps(func)
+            def _async_request(self, *args, **kwargs):
+                if not Metrics.is_enabled():
+                    return func(self, *args, **kwargs)
+
+                labels = (("api", type(self).__name__), ("endpoint", sys._getframe(1).f_code.co_name))
+                return Metrics._await_request(func(self, *args, **kwargs), labels)
+
+            return _async_request
+
+        @functools.wraps(func)
+        def _request(self, *args, **kwargs):
+            if not Metrics.is_enabled():
+                return func(self, *args, **kwargs)
+
+            labels = (("api", type(self).__name__), ("endpoint", sys._getframe(1).f_code.co_name))
+            start = time.monotonic()
+
+            try:
+                return func(self, *args, **kwargs)
+            except Exception:
+                Metrics.inc("opencryptobot_api_request_errors_total", labels)
+                raise
+            finally:
+                Metrics.observe("opencryptobot_api_request_duration_seconds", labels, time.monotonic() - start)
+
+        return _request
+
+    @staticmethod
+    async def _await_request(coro, labels):
+        start = time.monotonic()
+
+        try:
+            return await coro
+        except Exception:
+            Metrics.inc("opencryptobot_api_request_errors_total", labels)
+            raise
+        finally:
+            Metrics.observe("opencryptobot_api_request_duration_seconds", labels, time.monotonic() - start)
+
+    @staticmethod
+    def upstream(url, seconds, status):
+        """Record request that reached the API provider. 'status' is the
+        HTTP status code or 'error' if there was no response"""
+
+        if not Metrics.is_enabled():
+            return
+
+        host = urlsplit(url).hostname or "unknown"
+        command = getattr(Metrics._local, "command", None) or "none"
+
+        Metrics.observe("opencryptobot_upstream_request_duration_seconds", (("host", host),), seconds)
+        Metrics.inc(
+            "opencryptobot_upstream_requests_total",
+            (("command", command), ("host", host), ("status", str(status))))
+
+    # Output ---------------------------------------------
+
+    @staticmethod
+    def render():
+        """Return all metrics in the Prometheus text format"""
+
+        with Metrics._lock:
+            counters = dict(Metrics._counters)
+            histograms = {k: (list(v[0]), v[1], v[2]) for k, v in Metrics._histograms.items()}
+
+        lines = list()
+
+        for name, (kind, help_text) in Metrics.METRICS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+            if kind == "counter":
+                for (n, labels), value in sorted(counters.items()):
+                    if n == name:
+                        lines.append(f"{name}{Metrics._labels(labels)} {value}")
+                continue
+
+            for (n, labels), (counts, total, count) in sorted(histograms.items()):
+                if n != name:
+                    continue
+
+                cumulative = 0
+                for bound, bucket in zip(Metrics.BUCKETS + ("+Inf",), counts):
+                    cumulative += bucket
+                    le = labels + (("le", str(bound)),)
+                    lines.append(f"{name}_bucket{Metrics._labels(le)} {cumulative}")
+
+                lines.append(f"{name}_sum{Metrics._labels(labels)} {total}")
+                lines.append(f"{name}_count{Metrics._labels(labels)} {count}")
+
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def respond():
+        """Handler for the status server"""
+
+        return 200, Metrics.CONTENT_TYPE, Metrics.render()
+
+    @staticmethod
+    def summary(limit=10):
+        """Return slowest commands and API endpoints (by total time) as text"""
+
+        with Metrics._lock:
+            counters = dict(Metrics._counters)
+            histograms = {k: (list(v[0]), v[1], v[2]) for k, v in Metrics._histograms.items()}
+
+        def _section(title, name, errors):
+            rows = [(labels, h) for (n, labels), h in histograms.items() if n == name]
+            rows.sort(key=lambda r: r[1][1], reverse=True)
+
+            text = f"{title}\n"
+
+            for labels, (counts, total, count) in rows[:limit]:
+                label = ".".join(v for _, v in labels)
+                failed = counters.get((errors, labels), 0)
+                p95 = Metrics._quantile(counts, count, 0.95)
+
+                text += f"{label}: {count}x, avg {total / count:.2f}s, p95 <= {p95}s, {failed} errors\n"
+
+            return text if rows else f"{text}No data\n"
+
+        upstream = dict()
+        for (n, labels), value in counters.items():
+            if n == "opencryptobot_upstream_requests_total":
+                upstream[labels[0][1]] = upstream.get(labels[0][1], 0) + value
+
+        msg = _section("Commands", "opencryptobot_command_duration_seconds", "opencryptobot_command_errors_total")
+        msg += "\n"
+        msg += _section("API requests", "opencryptobot_api_request_duration_seconds", "opencryptobot_api_request_errors_total")
+        msg += "\nUpstream requests per command\n"
+        msg += "\n".join(f"{c}: {v}" for c, v in sorted(upstream.items(), key=lambda i: i[1], reverse=True)[:limit])
+
+        return msg if upstream else f"{msg}No data"
+
+    @staticmethod
+    def _quantile(counts, count, q):
+        """Return upper bound of bucket that contains the quantile"""
+
+        cumulative = 0
+        for bound, bucket in zip(Metrics.BUCKETS + ("+Inf",), counts):
+            cumulative += bucket
+            if cumulative >= q * count:
+                return bound
+        return "+Inf"
+
+    @staticmethod
+    def _labels(labels):
+        if not labels:
+            return ""
+
+        def _esc(value):
+            return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+        return "{" + ",".join(f'{k}="{_esc(v)}"' for k, v in labels) + "}"
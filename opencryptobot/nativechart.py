@@ -0,0 +1,182 @@
+import numpy as np
+
+from io import BytesIO
+
+
+# Same look as the plotly charts
+WIDTH = 800  # In pixel
+HEIGHT = 600  # In pixel
+DPI = 100
+BACKGROUND = "#e9e9e9"
+PRICE_COLOR = "#1660a7"
+VOLUME_COLOR = "#ff7f0e"
+LAST_COLOR = "#32ab60"
+UP_COLOR = "#3d9970"
+DOWN_COLOR = "#ff4136"
+
+
+def _figure():
+    # Imported here so that deployments with the
+    # plotly engine don't need matplotlib
+    import matplotlib
+    matplotlib.use("Agg")
+
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(WIDTH / DPI, HEIGHT / DPI), dpi=DPI, facecolor=BACKGROUND)
+    return fig
+
+
+def _price_formatter(max_value):
+    from matplotlib.ticker import FuncFormatter
+
+    if max_value > 999:
+        fmt = "{:,.0f}"
+    elif max_value > 0.9:
+        fmt = "{:.2f}"
+    else:
+        fmt = "{:.8f}"
+
+    return FuncFormatter(lambda v, _: fmt.format(v))
+
+
+def _style(ax):
+    ax.set_facecolor(BACKGROUND)
+    ax.grid(color="white", linewidth=1)
+    ax.set_axisbelow(True)
+
+    for spine in ax.spines.values():
+        spine.set_visible(False)
+
+    ax.tick_params(length=0, labelsize=9)
+
+
+def _to_png(fig):
+    bio = BytesIO()
+    # Low compression, encoding is the slowest part otherwise
+    fig.savefig(bio, format="png", facecolor=BACKGROUND, pil_kwargs={"compress_level": 1})
+    return bio.getvalue()
+
+
+def _set_time_ticks(ax, x, timestamps, rotation=30):
+    # Fixed ticks with preformatted labels. Much faster
+    # than letting matplotlib choose ticks on a date axis
+    ticks = np.linspace(0, len(x) - 1, num=min(len(x), 6), dtype=int)
+    seconds = np.asarray(timestamps, dtype="float64")[ticks].astype("int64")
+    dates = seconds.astype("datetime64[s]").astype("datetime64[m]").astype(str)
+
+    ax.set_xticks(np.asarray(x)[ticks])
+    ax.set_xticklabels([d.replace("T", " ") for d in dates], rotation=rotation, ha="right")
+
+
+class NativeChart:
+    """Charts rendered with matplotlib (Agg backend) instead of plotly and
+    kaleido. Takes arrays instead of figures, so the functions can be sent
+    to the render workers as they are. Figures and axes are created once
+    per process and reused, creating them takes longer than drawing.
+    Not thread-safe, every render worker runs one job at a time"""
+
+    _price_volume = None
+    _ohlc = None
+
+    @staticmethod
+    def price_volume(title, base_coin, prices, volumes):
+        """Price line above volume line. Prices and volumes are
+        arrays with rows of timestamp (in seconds) and value"""
+
+        prices = np.asarray(prices, dtype="float64").reshape(-1, 2)
+        volumes = np.asarray(volumes, dtype="float64").reshape(-1, 2)
+
+        if NativeChart._price_volume is None:
+            fig = _figure()
+            grid = fig.add_gridspec(2, 1, height_ratios=(3, 1), hspace=0.15,
+                                    left=0.15, right=0.95, top=0.86, bottom=0.15)
+
+            ax_price = fig.add_subplot(grid[0])
+            ax_volume = fig.add_subplot(grid[1], sharex=ax_price)
+
+            for ax in (ax_price, ax_volume):
+                _style(ax)
+
+            price, = ax_price.plot([], [], color=PRICE_COLOR, linewidth=2, label="Price")
+            last = ax_price.axhline(0, color=LAST_COLOR, linewidth=1, linestyle=":")
+            ax_price.tick_params(labelbottom=False)
+
+            volume, = ax_volume.plot([], [], color=VOLUME_COLOR, linewidth=1.5, label="Volume")
+            ax_volume.locator_params(axis="y", nbins=3)
+
+            fig.legend(loc="upper center", ncol=2, frameon=False, bbox_to_anchor=(0.5, 0.93))
+
+            NativeChart._price_volume = (fig, ax_price, ax_volume, price, last, volume)
+
+        fig, ax_price, ax_volume, price, last, volume = NativeChart._price_volume
+
+        price.set_data(prices[:, 0], prices[:, 1])
+        last.set_ydata([prices[-1, 1]] * 2)
+        volume.set_data(volumes[:, 0], volumes[:, 1])
+
+        for ax in (ax_price, ax_volume):
+            ax.relim()
+            ax.autoscale_view()
+
+        ax_price.yaxis.set_major_formatter(_price_formatter(prices[:, 1].max()))
+        ax_price.set_ylabel(base_coin, fontsize=14)
+        ax_volume.yaxis.set_major_formatter(_price_formatter(volumes[:, 1].max()))
+
+        _set_time_ticks(ax_volume, prices[:, 0], prices[:, 0])
+
+        fig.suptitle(title, fontsize=22)
+
+        return _to_png(fig)
+
+    @staticmethod
+    def ohlc(title, base_coin, timestamps, o, h, l, c):
+        """Candlestick chart. Timestamps in seconds"""
+
+        o = np.asarray(o, dtype="float64")
+        h = np.asarray(h, dtype="float64")
+        l = np.asarray(l, dtype="float64")
+        c = np.asarray(c, dtype="float64")
+
+        if NativeChart._ohlc is None:
+            fig = _figure()
+            ax = fig.add_axes((0.15, 0.15, 0.8, 0.71))
+            _style(ax)
+
+            last = ax.axhline(0, color=LAST_COLOR, linewidth=1, linestyle=":")
+
+            NativeChart._ohlc = (fig, ax, last)
+
+        fig, ax, last = NativeChart._ohlc
+
+        # Remove candles of previous chart
+        for collection in list(ax.collections):
+            collection.remove()
+
+        # Plotted on index so that gaps in the data don't leave space
+        x = np.arange(len(c))
+        colors = np.where(c >= o, UP_COLOR, DOWN_COLOR)
+
+        # Bodies take 60% of the space per candle (in points)
+        body_width = max(1.0, 0.6 * 0.8 * WIDTH / len(x) * 72 / DPI)
+
+        # Wicks and bodies are drawn as one line collection each
+        ax.vlines(x, l, h, colors=colors, linewidth=1)
+        ax.vlines(x, np.minimum(o, c), np.maximum(o, c), colors=colors, linewidth=body_width)
+
+        last.set_ydata([c[-1]] * 2)
+
+        # Autoscaling ignores collections
+        margin = (h.max() - l.min()) * 0.05 or abs(h.max()) * 0.05 or 1
+        ax.set_ylim(l.min() - margin, h.max() + margin)
+        ax.set_xlim(-1, len(x))
+
+        ax.yaxis.set_major_formatter(_price_formatter(h.max()))
+        ax.set_ylabel(base_coin, fontsize=14)
+
+        # Label some candles with their date
+        _set_time_ticks(ax, x, timestamps)
+
+        fig.suptitle(title, fontsize=22)
+
+        return _to_png(fig)
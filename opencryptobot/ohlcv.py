@@ -0,0 +1,154 @@
+import numpy as np
+
+
+class OHLCV:
+    """Column-oriented OHLCV data. Every column is a contiguous NumPy
+    float64 array, time is in seconds (UTC). Parsers read the payload of
+    an API provider in one pass"""
+
+    COLUMNS = ("t", "o", "h", "l", "c", "v")
+
+    def __init__(self, columns=None):
+        if columns is None:
+            columns = np.empty((len(self.COLUMNS), 0))
+
+        # One row per column so that every column is contiguous
+        self.columns = np.ascontiguousarray(columns, dtype="float64")
+
+    @property
+    def t(self):
+        return self.columns[0]
+
+    @property
+    def o(self):
+        return self.columns[1]
+
+    @property
+    def h(self):
+        return self.columns[2]
+
+    @property
+    def l(self):
+        return self.columns[3]
+
+    @property
+    def c(self):
+        return self.columns[4]
+
+    @property
+    def v(self):
+        return self.columns[5]
+
+    def __len__(self):
+        return self.columns.shape[1]
+
+    def __getitem__(self, key):
+        """Points selected by index, slice or boolean mask"""
+
+        return OHLCV(self.columns[:, key])
+
+    @classmethod
+    def concat(cls, *parts):
+        """Points of all parts in the given order"""
+
+        return cls(np.concatenate([p.columns for p in parts], axis=1))
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Create from rows of (time, open, high, low, close, volume)"""
+
+        rows = np.asarray(rows, dtype="float64").reshape(-1, len(cls.COLUMNS))
+        return cls(rows.T)
+
+    @classmethod
+    def from_cryptocompare(cls, data):
+        """Parse 'Data' of CryptoCompare historical OHLCV"""
+
+        return cls.from_rows([(
+            d["time"],
+            d["open"],
+            d["high"],
+            d["low"],
+            d["close"],
+            d["volumefrom"]) for d in data])
+
+    @classmethod
+    def from_coinpaprika(cls, data):
+        """Parse CoinPaprika historical OHLC. Time is the close time"""
+
+        times = list()
+        rows = list()
+
+        for d in data:
+            # Without 'Z', NumPy doesn't parse time zones
+            times.append(d["time_close"][:19])
+            rows.append((0, d["open"], d["high"], d["low"], d["close"], d["volume"] or 0))
+
+        ohlcv = cls.from_rows(rows)
+        ohlcv.columns[0] = np.array(times, dtype="datetime64[s]").astype("int64")
+        return ohlcv
+
+    @classmethod
+    def from_coingecko(cls, market_chart):
+        """Parse CoinGecko market chart. There is only one price per point,
+        so open, high, low and close are the same. Volume is the rolling
+        24 hours volume at that point"""
+
+        prices = np.asarray(market_chart["prices"], dtype="float64").reshape(-1, 2)
+        volumes = np.asarray(market_chart["total_volumes"], dtype="float64").reshape(-1, 2)
+
+        t = prices[:, 0] / 1000
+        p = prices[:, 1]
+
+        if len(volumes) == len(prices):
+            v = volumes[:, 1]
+        else:
+            v = np.interp(prices[:, 0], volumes[:, 0], volumes[:, 1])
+
+        return cls((t, p, p, p, p, v))
+
+    def rows(self):
+        """List of rows of (time, open, high, low, close, volume)"""
+
+        return self.columns.T.tolist()
+
+    def is_flat(self):
+        """True if open, high, low and close are identical for all points"""
+
+        prices = self.columns[1:5]
+        return bool((prices == prices[0]).all())
+
+    def datetimes(self):
+        """Time column as NumPy datetime64 in seconds"""
+
+        return self.t.astype("int64").astype("datetime64[s]")
+
+    def downsample(self, max_points, candles=True):
+        """Return data with at most 'max_points' points. Consecutive points
+        are merged: first open, highest high, lowest low, last close. If
+        'candles' is True, time is the time of the first point and volumes
+        are added up. Otherwise, time and volume of the last point are used"""
+
+        n = len(self)
+
+        if n <= max_points:
+            return self
+
+        size = -(-n // max_points)  # Rounded up
+        first = np.arange(0, n, size)
+        last = np.append(first[1:] - 1, n - 1)
+
+        columns = np.empty((len(self.COLUMNS), len(first)))
+        columns[1] = self.o[first]
+        columns[2] = np.maximum.reduceat(self.h, first)
+        columns[3] = np.minimum.reduceat(self.l, first)
+        columns[4] = self.c[last]
+
+        if candles:
+            columns[0] = self.t[first]
+            columns[5] = np.add.reduceat(self.v, first)
+        else:
+            columns[0] = self.t[last]
+            columns[5] = self.v[last]
+
+        return OHLCV(columns)
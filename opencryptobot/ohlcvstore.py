@@ -0,0 +1,159 @@
+import os
+import sqlite3
+import logging
+import threading
+import numpy as np
+import opencryptobot.constants as con
+
+from opencryptobot.ohlcv import OHLCV
+from opencryptobot.config import ConfigManager as Cfg
+from opencryptobot.sqlmanager import SQLManager
+
+
+class OHLCVStore:
+    """Historical chart data in a SQLite file, one series per source, pair
+    and granularity. Only complete data points are saved. If the stored
+    series covers the requested time frame, only the missing tail is
+    fetched from the API provider and merged with the stored data"""
+
+    DEF_PATH = os.path.join(con.DAT_DIR, "ohlcv.db")
+    DEF_MAX_POINTS = 5000  # Max number of points saved per series
+
+    _con = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get(source, pair, granularity, start, fetch):
+        """Return data of series from 'start' (in seconds) until now.
+        'fetch(since)' has to return the data from the API provider as
+        'OHLCV', starting with the point at 'since' (in seconds) or for
+        the whole time frame if 'since' is None"""
+
+        if not Cfg.get("ohlcv_store", "enabled"):
+            return fetch(None)
+
+        series = (source, pair.upper(), granularity)
+
+        try:
+            stored, last = OHLCVStore._read(series, start)
+        except Exception as e:
+            logging.error(f"Can't read stored chart data: {repr(e)}")
+            return fetch(None)
+
+        if last is None:
+            ohlcv = fetch(None)
+            OHLCVStore._save(series, ohlcv, replace=True)
+            return ohlcv
+
+        # Missing tail starts with the last stored point
+        tail = OHLCVStore._thin(fetch(last), last, granularity)
+        OHLCVStore._save(series, tail)
+
+        if not len(tail):
+            return stored
+
+        return OHLCV.concat(stored[stored.t < tail.t[0]], tail)
+
+    @staticmethod
+    def close():
+        with OHLCVStore._lock:
+            if OHLCVStore._con is not None:
+                OHLCVStore._con.close()
+                OHLCVStore._con = None
+
+    @staticmethod
+    def get_sql(filename):
+        return SQLManager.get(OHLCVStore.__name__.lower(), filename)
+
+    @staticmethod
+    def _get_con():
+        if OHLCVStore._con is None:
+            path = Cfg.get("ohlcv_store", "path") or OHLCVStore.DEF_PATH
+
+            data_dir = os.path.dirname(path)
+            if data_dir:
+                os.makedirs(data_dir, exist_ok=True)
+
+            con = sqlite3.connect(path, check_same_thread=False)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+
+            with con:
+                con.execute(OHLCVStore.get_sql("series"))
+                con.execute(OHLCVStore.get_sql("candles"))
+
+            OHLCVStore._con = con
+
+        return OHLCVStore._con
+
+    @staticmethod
+    def _read(series, start):
+        """Return stored points since 'start' and time of the last stored
+        point. Time is None if the stored points don't cover 'start'"""
+
+        with OHLCVStore._lock:
+            con = OHLCVStore._get_con()
+
+            row = con.execute(OHLCVStore.get_sql("series_read"), series).fetchone()
+
+            # Series doesn't start early enough or ends before the time
+            # frame. Then fetching the whole time frame costs the same
+            if not row or row[0] > start + series[2] or row[1] < start:
+                return None, None
+
+            rows = con.execute(OHLCVStore.get_sql("candles_read"), series + (start,)).fetchall()
+
+        return OHLCV.from_rows(rows), row[1]
+
+    @staticmethod
+    def _save(series, ohlcv, replace=False):
+        """Save complete points of 'ohlcv'. The last point is still changing.
+        If 'replace' is True, saved points of the series are replaced"""
+
+        complete = ohlcv[:-1]
+
+        if not len(complete):
+            return
+
+        max_points = Cfg.get("ohlcv_store", "max_points") or OHLCVStore.DEF_MAX_POINTS
+
+        last = complete.t[-1]
+        cutoff = last - max_points * series[2]
+
+        try:
+            with OHLCVStore._lock:
+                con = OHLCVStore._get_con()
+
+                with con:
+                    row = con.execute(OHLCVStore.get_sql("series_read"), series).fetchone()
+                    first = complete.t[0] if replace or not row else row[0]
+
+                    if replace:
+                        cutoff = max(cutoff, first)
+
+                    con.execute(OHLCVStore.get_sql("candles_delete"), series + (cutoff,))
+                    con.executemany(
+                        OHLCVStore.get_sql("candles_save"),
+                        [series + tuple(r) for r in complete.rows()])
+                    con.execute(
+                        OHLCVStore.get_sql("series_save"),
+                        series + (max(first, cutoff), last))
+        except Exception as e:
+            logging.error(f"Can't save chart data: {repr(e)}")
+
+    @staticmethod
+    def _thin(ohlcv, since, granularity):
+        """Keep the first point per granularity of a tail. Some APIs return
+        finer data for short time frames. The last point is always kept
+        since it's the current one"""
+
+        if not len(ohlcv):
+            return ohlcv
+
+        buckets = ohlcv.t // granularity
+
+        keep = np.append(True, buckets[1:] != buckets[:-1])
+        keep &= buckets >= since // granularity
+        keep[-1] = True
+
+        return ohlcv[keep]
@@ -1,12 +1,15 @@
 import inspect
 import logging
+import threading
 import opencryptobot.emoji as emo
 import opencryptobot.utils as utl
-import os
 
 from telegram.ext import CommandHandler
 from telegram import ChatAction, ParseMode
+from opencryptobot.metrics import Metrics
 from opencryptobot.config import ConfigManager as Cfg
+from opencryptobot.sqlmanager import SQLManager
+from opencryptobot.mediaregistry import MediaRegistry
 
 
 class PluginInterface:
@@ -45,6 +48,17 @@ class PluginInterface:
     def after_plugins_loaded(self):
         return None
 
+    # Name of the plugin module
+    def get_name(self):
+        return type(self).__name__.lower()
+
+    # Can the module be imported on first use instead of at startup.
+    # Not possible if the plugin has to do something once it's loaded
+    def lazy_loading(self):
+        cls = type(self)
+        return cls.after_plugin_loaded is PluginInterface.after_plugin_loaded and \
+            cls.after_plugins_loaded is PluginInterface.after_plugins_loaded
+
 
 class OpenCryptoPlugin(PluginInterface):
 
@@ -54,6 +68,13 @@ class OpenCryptoPlugin(PluginInterface):
         self.tgb = telegram_bot
         self.add_plugin()
 
+    # Measure every command, no matter how it's triggered
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        if "get_action" in vars(cls):
+            cls.get_action = Metrics.command(cls.get_action)
+
     @classmethod
     def send_typing(cls, func):
         def _send_typing_action(self, update, context):
@@ -101,27 +122,26 @@ class OpenCryptoPlugin(PluginInterface):
                 if usr.id in Cfg.get("admin_id"):
                     return func(self, update, context)
 
-                sql = self.get_sql("save_usage")
-                self.tgb.db.execute_sql(sql, (usr.id, usr.username, usr.first_name,
-                                            usr.last_name, usr.language_code, cmd,
-                                            cht.id, cht.type, cht.title))
+                # Saved in background, doesn't delay the reply
+                self.tgb.db.log_cmd(usr, cht, cmd)
 
             return func(self, update, context)
         return _save_data
 
     def add_plugin(self):
-        for cmd in self.get_cmds():
-            self.tgb.dispatcher.add_handler(
-                CommandHandler(
-                    cmd,
-                    self.get_action))
+        # Kept so that exactly these handlers can be removed
+        self._handlers = [CommandHandler(cmd, self.get_action) for cmd in self.get_cmds()]
+
+        for handler in self._handlers:
+            self.tgb.dispatcher.add_handler(handler)
+
+        self.tgb.register_plugin(self)
 
     def remove_plugin(self):
-        for cmd in self.get_cmds():
-            self.tgb.dispatcher.remove_handler(
-                CommandHandler(
-                    cmd,
-                    self.get_action))
+        for handler in self._handlers:
+            self.tgb.dispatcher.remove_handler(handler)
+
+        self.tgb.unregister_plugin(self)
 
     def send_msg(self, msg, update, keywords):
         if not keywords:
@@ -154,20 +174,38 @@ class OpenCryptoPlugin(PluginInterface):
         parse = keywords.get(Keyword.PARSE, ParseMode.MARKDOWN)
 
         if update.message:
-            update.message.reply_photo(
-                photo=photo,
+            self.reply_photo(
+                update.message,
+                photo,
                 parse_mode=parse,
                 disable_notification=not notify,
                 quote=quote)
         elif update.callback_query:
-            update.callback_query.message.reply_photo(
-                photo=photo,
+            self.reply_photo(
+                update.callback_query.message,
+                photo,
                 parse_mode=parse,
                 disable_notification=not notify)
 
+    # Reply with photo. If it's bytes, identical photos
+    # are sent by 'file_id' instead of uploading them
+    def reply_photo(self, message, photo, **kwargs):
+        if isinstance(photo, bytes):
+            return MediaRegistry.reply_photo(self.tgb.db, message, photo, **kwargs)
+        return message.reply_photo(photo=photo, **kwargs)
+
+    # Reply with document. If it's bytes, identical documents
+    # are sent by 'file_id' instead of uploading them
+    def reply_document(self, message, document, filename, **kwargs):
+        if isinstance(document, bytes):
+            return MediaRegistry.reply_document(self.tgb.db, message, document, filename, **kwargs)
+        return message.reply_document(document=document, filename=filename, **kwargs)
+
     def handle_error(self, error, update, send_error=True):
         logging.error(f"{error} - {update}")
 
+        Metrics.command_error(self)
+
         if send_error:
             msg = f"{emo.ERROR} {error}"
             self.send_msg(msg, update, None)
@@ -182,9 +220,71 @@ class OpenCryptoPlugin(PluginInterface):
         return menu
 
     def get_sql(self, filename):
-        sql_file = os.path.join(con.SQL_DIR, f"{filename}.sql")
-        with open(sql_file, "r", encoding="utf8") as file:
-            return file.read()
+        return SQLManager.get(type(self).__name__.lower(), filename)
+
+
+class LazyPlugin(PluginInterface):
+    """Stands in for a plugin whose module isn't imported yet. Commands,
+    description, category and inline mode are taken from the manifest
+    entry. The plugin is loaded and replaces this one on first use"""
+
+    def __init__(self, telegram_bot, module_name, entry):
+        super().__init__()
+
+        self.tgb = telegram_bot
+        self._module_name = module_name
+        self._entry = entry
+
+        self._plugin = None
+        self._lock = threading.Lock()
+
+        self._handlers = [CommandHandler(cmd, self.get_action) for cmd in self.get_cmds()]
+
+        for handler in self._handlers:
+            self.tgb.dispatcher.add_handler(handler)
+
+        self.tgb.register_plugin(self)
+
+    def get_cmds(self):
+        return list(self._entry["cmds"])
+
+    # Handlers and arguments differ between plugins, so pass on everything
+    def get_action(self, *args, **kwargs):
+        return self.load().get_action(*args, **kwargs)
+
+    def get_usage(self):
+        return self.load().get_usage()
+
+    def get_description(self):
+        return self._entry.get("description")
+
+    def get_category(self):
+        return self._entry.get("category")
+
+    def inline_mode(self):
+        return self._entry.get("inline", False)
+
+    def get_name(self):
+        return self._module_name
+
+    def load(self):
+        """Import and load the plugin if that didn't happen yet and return it"""
+
+        if self._plugin is None:
+            with self._lock:
+                if self._plugin is None:
+                    # Replaces this plugin in the index
+                    plugin = self.tgb.load_plugin(self._module_name)
+                    self.remove_plugin()
+                    self._plugin = plugin
+
+        return self._plugin
+
+    def remove_plugin(self):
+        for handler in self._handlers:
+            self.tgb.dispatcher.remove_handler(handler)
+
+        self.tgb.unregister_plugin(self)
 
 
 class Keyword:
@@ -194,6 +294,7 @@ class Keyword:
     QUOTE = "quote"
     PARSE = "parse"
     INLINE = "inline"
+    PNG = "png"
 
 
 class Category:
@@ -0,0 +1,107 @@
+import os
+import json
+import hashlib
+import logging
+import importlib
+import opencryptobot.constants as con
+
+
+class PluginManifest:
+    """Metadata of all plugins so that they can be registered without
+    importing their modules. Key is the module name, value is a dict
+    with commands, description, category, inline mode, if the plugin
+    can be loaded lazily and the hash of the module file"""
+
+    @staticmethod
+    def get_path():
+        return os.path.join(con.SRC_DIR, con.PLG_DIR, con.PLG_MANIFEST)
+
+    @staticmethod
+    def get_modules():
+        """Return names of all plugin modules"""
+
+        modules = list()
+
+        for file in sorted(os.listdir(os.path.join(con.SRC_DIR, con.PLG_DIR))):
+            if not file.lower().endswith(".py"):
+                continue
+            if file.startswith("_"):
+                continue
+
+            modules.append(file[:-3])
+
+        return modules
+
+    @staticmethod
+    def get_hash(module_name):
+        file = os.path.join(con.SRC_DIR, con.PLG_DIR, f"{module_name}.py")
+
+        with open(file, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+
+    @staticmethod
+    def create():
+        """Import all plugin modules and return their metadata"""
+
+        manifest = dict()
+
+        for module_name in PluginManifest.get_modules():
+            try:
+                module_path = f"{con.SRC_DIR}.{con.PLG_DIR}.{module_name}"
+                module = importlib.import_module(module_path)
+
+                plugin_class = getattr(module, module_name.capitalize())
+
+                # Metadata doesn't need a bot, so skip '__init__'
+                plugin = plugin_class.__new__(plugin_class)
+
+                manifest[module_name] = {
+                    "cmds": plugin.get_cmds(),
+                    "description": plugin.get_description(),
+                    "category": plugin.get_category(),
+                    "inline": plugin.inline_mode(),
+                    "lazy": plugin.lazy_loading(),
+                    "hash": PluginManifest.get_hash(module_name)
+                }
+            except Exception as ex:
+                msg = f"File '{module_name}.py' can't be added to the manifest: {ex}"
+                logging.warning(msg)
+
+        return manifest
+
+    @staticmethod
+    def write(path=None):
+        path = path or PluginManifest.get_path()
+
+        manifest = PluginManifest.create()
+
+        with open(path, "w") as file:
+            json.dump(manifest, file, indent=4)
+
+        logging.info(f"Saved manifest of {len(manifest)} plugins to {path}")
+
+    @staticmethod
+    def read(path=None):
+        """Return manifest or an empty dict if it can't be read. Plugins
+        that changed after the manifest was written are not included"""
+
+        path = path or PluginManifest.get_path()
+
+        try:
+            with open(path, "r") as file:
+                manifest = json.load(file)
+        except Exception as ex:
+            logging.warning(f"Can't read plugin manifest: {ex}")
+            return dict()
+
+        for module_name in list(manifest):
+            try:
+                changed = PluginManifest.get_hash(module_name) != manifest[module_name].get("hash")
+            except OSError:
+                changed = True
+
+            if changed:
+                logging.info(f"Plugin '{module_name}' changed after the manifest was saved")
+                del manifest[module_name]
+
+        return manifest
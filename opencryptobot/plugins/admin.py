@@ -2,6 +2,7 @@ import opencryptobot.utils as utl
 import opencryptobot.emoji as emo
 
 from collections import OrderedDict
+from opencryptobot.metrics import Metrics
 from opencryptobot.plugin import OpenCryptoPlugin
 from opencryptobot.config import ConfigManager as Cfg
 from telegram import ParseMode, InlineKeyboardMarkup, InlineKeyboardButton
@@ -21,6 +22,10 @@ class Admin(OpenCryptoPlugin):
     def get_cmds(self):
         return ["admin"]
 
+    # Buttons of earlier messages need the callback handler
+    def lazy_loading(self):
+        return False
+
     @OpenCryptoPlugin.only_owner
     @OpenCryptoPlugin.send_typing
     def get_action(self, bot, update, args):
@@ -95,6 +100,13 @@ class Admin(OpenCryptoPlugin):
                 else:
                     update.message.reply_text(f"{emo.INFO} Database not enabled")
 
+            # Show latency of commands and API requests
+            elif command == "metrics":
+                if Metrics.is_enabled():
+                    update.message.reply_text(Metrics.summary())
+                else:
+                    update.message.reply_text(f"{emo.INFO} Metrics not enabled")
+
             # Manage plugins
             elif command == "plg":
                 args.pop(0)
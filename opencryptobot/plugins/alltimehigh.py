@@ -48,22 +48,20 @@ class Alltimehigh(OpenCryptoPlugin):
 
         # Get coin ID
         try:
-            response = APICache.get_cg_coins_list()
+            coin_id = APICache.resolve_symbol(coin)
         except Exception as e:
             return self.handle_error(e, update)
 
-        for entry in response:
-            if entry["symbol"].lower() == coin.lower():
-                try:
-                    coin_info = CoinGecko().get_coin_by_id(entry["id"])
-                except Exception as e:
-                    return self.handle_error(e, update)
-
-                cur_price = coin_info["market_data"]["current_price"]
-                ath_price = coin_info["market_data"]["ath"]
-                ath_date = coin_info["market_data"]["ath_date"]
-                ath_change = coin_info["market_data"]["ath_change_percentage"]
-                break
+        if coin_id:
+            try:
+                coin_info = CoinGecko().get_coin_by_id(coin_id)
+            except Exception as e:
+                return self.handle_error(e, update)
+
+            cur_price = coin_info["market_data"]["current_price"]
+            ath_price = coin_info["market_data"]["ath"]
+            ath_date = coin_info["market_data"]["ath_date"]
+            ath_change = coin_info["market_data"]["ath_change_percentage"]
 
         msg = str()
 
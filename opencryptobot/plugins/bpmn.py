@@ -22,25 +22,22 @@ class Bpmn(OpenCryptoPlugin):
 
         cmd = args[0].replace("/", "").lower()
 
-        cmd_found = False
-        for plgn in self.tgb.plugins:
-            if cmd in plgn.get_cmds():
-                cmd_found = True
-
-        if not cmd_found:
+        if not self.tgb.get_plugin(cmd):
             msg = f"{emo.ERROR} Command `/{cmd}` doesn't exist"
             update.message.reply_text(msg, parse_mode=ParseMode.MARKDOWN)
             return
 
         try:
-            bpmn = open(os.path.join(con.BPMN_DIR, f"{cmd}.png"), "rb")
+            with open(os.path.join(con.BPMN_DIR, f"{cmd}.png"), "rb") as f:
+                bpmn = f.read()
         except Exception:
             msg = f"{emo.INFO} No BPMN diagram found for `/{cmd}`"
             update.message.reply_text(msg, parse_mode=ParseMode.MARKDOWN)
             return
 
-        update.message.reply_photo(
-            photo=bpmn,
+        self.reply_photo(
+            update.message,
+            bpmn,
             caption=f"Process flow for `/{cmd}` command",
             parse_mode=ParseMode.MARKDOWN)
 
@@ -1,9 +1,5 @@
-import io
 import time
-import threading
-import pandas as pd
 import plotly.io as pio
-import dateutil.parser as dau
 import plotly.graph_objs as go
 import opencryptobot.emoji as emo
 import opencryptobot.utils as utl
@@ -12,17 +8,26 @@ import opencryptobot.constants as con
 
 from io import BytesIO
 from telegram import ParseMode
+from opencryptobot.ohlcv import OHLCV
+from opencryptobot.ohlcvstore import OHLCVStore
 from opencryptobot.ratelimit import RateLimit
+from opencryptobot.renderer import ChartRenderer, RenderQueueFull, RenderTimeout
+from opencryptobot.chartcache import ChartCache
+from opencryptobot.nativechart import NativeChart
 from opencryptobot.api.apicache import APICache
 from opencryptobot.api.coinpaprika import CoinPaprika
-from opencryptobot.api.cryptocompare import CryptoCompare
+from opencryptobot.api.cryptocompare import CryptoCompare, CryptoCompareError
 from opencryptobot.plugin import OpenCryptoPlugin, Category, Keyword
 
 
 # TODO: Add source of data and time frame
 class Candlestick(OpenCryptoPlugin):
 
-    cmc_coin_id = None
+    # Seconds between data points per resolution
+    GRANULARITY = {"MINUTE": 60, "HOUR": 3600, "DAY": 86400}
+
+    # More candles than that aren't readable on the chart
+    MAX_CANDLES = 300
 
     def get_cmds(self):
         return ["cs", "candle", "candlestick"]
@@ -62,18 +67,6 @@ class Candlestick(OpenCryptoPlugin):
                 parse_mode=ParseMode.MARKDOWN)
             return
 
-        if RateLimit.limit_reached(update):
-            return
-
-        # Send loading message
-        loading_msg = update.message.reply_text(
-            text=f"{emo.CHART} Generating candlestick chart for *{coin}*-*{base_coin}* ({time_frame}{resolution[0].lower()})...",
-            parse_mode=ParseMode.MARKDOWN
-        )
-
-        cmc_thread = threading.Thread(target=self._get_cmc_coin_id, args=[coin])
-        cmc_thread.start()
-
         # Time frame
         if len(arg_list) > 1:
             if arg_list[1].lower().endswith("m") and arg_list[1][:-1].isnumeric():
@@ -86,40 +79,49 @@ class Candlestick(OpenCryptoPlugin):
                 resolution = "DAY"
                 time_frame = arg_list[1][:-1]
             else:
-                loading_msg.delete()
                 update.message.reply_text(
                     text=f"{emo.ERROR} Argument *{arg_list[1]}* is invalid",
                     parse_mode=ParseMode.MARKDOWN)
                 return
 
-        try:
-            if resolution == "MINUTE":
-                ohlcv = CryptoCompare().get_historical_ohlcv_minute(
-                    coin,
-                    base_coin,
-                    time_frame)
-            elif resolution == "HOUR":
-                ohlcv = CryptoCompare().get_historical_ohlcv_hourly(
-                    coin,
-                    base_coin,
-                    time_frame)
-            elif resolution == "DAY":
-                ohlcv = CryptoCompare().get_historical_ohlcv_daily(
-                    coin,
-                    base_coin,
-                    time_frame)
+        if RateLimit.limit_reached(update):
+            return
+
+        # Chart with the same data was already rendered
+        inline = keywords.get(Keyword.INLINE)
+        fmt = "png" if keywords.get(Keyword.PNG) or inline else "html"
+        granularity = self.GRANULARITY.get(resolution, 3600)
+        cache_key = ChartCache.key(granularity, "candlestick", coin, base_coin, time_frame, resolution, fmt)
+        chart = ChartCache.get(cache_key)
+
+        if chart and inline:
+            return BytesIO(chart), "candlestick.png"
+        if chart:
+            return self._send_cached(chart, fmt, update)
+
+        # Send loading message
+        loading_msg = update.message.reply_text(
+            text=f"{emo.CHART} Generating candlestick chart for *{coin}*-*{base_coin}* ({time_frame}{resolution[0].lower()})...",
+            parse_mode=ParseMode.MARKDOWN
+        )
+
+        # Stored data plus the candles since the last stored one
+        start = (time.time() // granularity - int(time_frame)) * granularity
+        pair = f"{coin}-{base_coin}"
+
+        def _fetch(since):
+            if since is None:
+                limit = time_frame
             else:
-                ohlcv = CryptoCompare().get_historical_ohlcv_hourly(
-                    coin,
-                    base_coin,
-                    time_frame)
-        except Exception as e:
-            loading_msg.delete()
-            return self.handle_error(e, update)
+                limit = max(int(time.time() // granularity - since // granularity), 1)
+
+            return self._get_ohlcv(coin, base_coin, resolution, limit)
 
-        if ohlcv["Response"] == "Error":
+        try:
+            ohlcv = OHLCVStore.get("cryptocompare", pair, granularity, start, _fetch)
+        except CryptoCompareError as e:
             loading_msg.delete()
-            if ohlcv["Message"] == "limit is larger than max value.":
+            if str(e) == "limit is larger than max value.":
                 update.message.reply_text(
                     text=f"{emo.ERROR} Time frame can't be larger "
                     f"then *{con.CG_DATA_LIMIT}* data points",
@@ -127,24 +129,17 @@ class Candlestick(OpenCryptoPlugin):
                 return
             else:
                 update.message.reply_text(
-                    text=f"{emo.ERROR} CryptoCompare: {ohlcv['Message']}",
+                    text=f"{emo.ERROR} CryptoCompare: {e}",
                     parse_mode=ParseMode.MARKDOWN)
                 return
+        except (KeyError, TypeError, ValueError):
+            loading_msg.delete()
+            return self.handle_error(f"No OHLC data for {coin}", update)
+        except Exception as e:
+            loading_msg.delete()
+            return self.handle_error(e, update)
 
-        ohlcv = ohlcv["Data"]
-
-        if ohlcv:
-            try:
-                o = [value["open"] for value in ohlcv]
-                h = [value["high"] for value in ohlcv]
-                l = [value["low"] for value in ohlcv]
-                c = [value["close"] for value in ohlcv]
-                t = [value["time"] for value in ohlcv]
-            except:
-                loading_msg.delete()
-                return self.handle_error(f"No OHLC data for {coin}", update)
-
-        if not ohlcv or utl.all_same(o, h, l, c):
+        if not len(ohlcv) or ohlcv.is_flat():
             loading_msg.delete()
             if base_coin != "BTC" and base_coin != "USD":
                 update.message.reply_text(
@@ -172,6 +167,8 @@ class Candlestick(OpenCryptoPlugin):
                 loading_msg.delete()
                 return self.handle_error(e, update)
 
+            data = None
+
             for c in cp_ohlc:
                 if c["symbol"] == coin:
                     # Current datetime in seconds
@@ -182,7 +179,7 @@ class Candlestick(OpenCryptoPlugin):
                     t_start = t_now - int(time_frame)
 
                     try:
-                        ohlcv = CoinPaprika().get_historical_ohlc(
+                        data = CoinPaprika().get_historical_ohlc(
                             c["id"],
                             int(t_start),
                             end=int(t_now),
@@ -195,7 +192,7 @@ class Candlestick(OpenCryptoPlugin):
                     cp_api = True
                     break
 
-            if not ohlcv:
+            if not data:
                 loading_msg.delete()
                 update.message.reply_text(
                     text=f"{emo.ERROR} No OHLC data for *{coin}* "
@@ -204,19 +201,26 @@ class Candlestick(OpenCryptoPlugin):
                 return
 
             try:
-                o = [value["open"] for value in ohlcv]
-                h = [value["high"] for value in ohlcv]
-                l = [value["low"] for value in ohlcv]
-                c = [value["close"] for value in ohlcv]
-                t = [time.mktime(dau.parse(value["time_close"]).timetuple()) for value in ohlcv]
-            except:
+                ohlcv = OHLCV.from_coinpaprika(data)
+            except Exception:
                 loading_msg.delete()
                 return self.handle_error(f"No OHLC data for {coin}", update)
 
+        ohlcv = ohlcv.downsample(self.MAX_CANDLES)
+
+        # Render from arrays without building a plotly figure
+        if keywords.get(Keyword.PNG) and ChartRenderer.get_engine() == "matplotlib":
+            loading_msg.delete()
+
+            return self._send_rendered(
+                lambda: ChartRenderer.submit_call(
+                    NativeChart.ohlc, coin, base_coin, ohlcv.t, ohlcv.o, ohlcv.h, ohlcv.l, ohlcv.c),
+                update, cache_key)
+
         margin_l = 140
         tickformat = "0.8f"
 
-        max_value = max(h)
+        max_value = ohlcv.h.max()
         if max_value > 0.9:
             if max_value > 999:
                 margin_l = 110
@@ -225,23 +229,13 @@ class Candlestick(OpenCryptoPlugin):
                 margin_l = 115
                 tickformat = "0.2f"
 
-        data = [
-            go.Candlestick(
-                x=[pd.to_datetime(tm, unit='s').strftime('%Y-%m-%d %H:%M:%S') for tm in t],
-                open=o,
-                high=h,
-                low=l,
-                close=c
-            )
-        ]
-
         try:
             fig = fif.create_candlestick(
-                open=o,
-                high=h,
-                low=l,
-                close=c,
-                dates=[pd.to_datetime(tm, unit='s').strftime('%Y-%m-%d %H:%M:%S') for tm in t],
+                open=ohlcv.o,
+                high=ohlcv.h,
+                low=ohlcv.l,
+                close=ohlcv.c,
+                dates=ohlcv.datetimes(),
                 direction="both",
                 title=coin
             )
@@ -256,9 +250,12 @@ class Candlestick(OpenCryptoPlugin):
         fig.layout.yaxis.ticksuffix = f"   {base_coin}"
         fig.layout.yaxis.tickfont.size = 12
 
+        # Only a lookup, the coin list is kept in the API cache
+        cmc_coin_id = self._get_cmc_coin_id(coin)
+
         fig.layout.update(
             images=[dict(
-                source=f"{con.CMC_LOGO_URL_PARTIAL}{self.cmc_coin_id}.png",
+                source=f"{con.CMC_LOGO_URL_PARTIAL}{cmc_coin_id}.png",
                 opacity=0.8,
                 xref="paper", yref="paper",
                 x=1.05, y=1,
@@ -281,8 +278,8 @@ class Candlestick(OpenCryptoPlugin):
                 "yref": "y",
                 "x0": 0,
                 "x1": 1,
-                "y0": c[len(c) - 1],
-                "y1": c[len(c) - 1],
+                "y0": ohlcv.c[-1],
+                "y1": ohlcv.c[-1],
                 "line": {
                     "color": "rgb(50, 171, 96)",
                     "width": 1,
@@ -295,34 +292,76 @@ class Candlestick(OpenCryptoPlugin):
 
         # Delete loading message before sending chart
         loading_msg.delete()
-        self.send_chart(fig, update, keywords)
+        self.send_chart(fig, update, keywords, cache_key)
 
-    def send_chart(self, fig, update, keywords):
-        if keywords.get(Keyword.PNG):
-            pio.write_image(fig, 'candlestick.png')
+    def _get_ohlcv(self, coin, base_coin, resolution, limit):
+        if resolution == "MINUTE":
+            data = CryptoCompare().get_historical_ohlcv_minute(coin, base_coin, limit)
+        elif resolution == "DAY":
+            data = CryptoCompare().get_historical_ohlcv_daily(coin, base_coin, limit)
+        else:
+            data = CryptoCompare().get_historical_ohlcv_hourly(coin, base_coin, limit)
 
-            with open('candlestick.png', 'rb') as f:
-                photo = io.BufferedReader(f)
-                update.message.reply_photo(photo=photo)
-            return
+        if data["Response"] == "Error":
+            raise CryptoCompareError(data["Message"])
+
+        return OHLCV.from_cryptocompare(data["Data"] or [])
+
+    def send_chart(self, fig, update, keywords, cache_key=None):
+        if keywords.get(Keyword.PNG):
+            return self._send_rendered(lambda: ChartRenderer.render_png(fig), update, cache_key)
 
         if keywords.get(Keyword.INLINE):
             filename = f"candlestick.png"
 
-            bio = BytesIO()
-            pio.write_image(fig, bio, format="png")
-            bio.seek(0)
-            return bio, filename
+            try:
+                png = ChartRenderer.render(fig)
+            except (RenderQueueFull, RenderTimeout) as e:
+                self.handle_error(e, update, send_error=False)
+                return f"{emo.ERROR} {e}"
+            except Exception as e:
+                self.handle_error(e, update, send_error=False)
+                return f"{emo.ERROR} Can't render chart"
+
+            if cache_key:
+                ChartCache.put(cache_key, png)
+
+            return BytesIO(png), filename
+
+        chart = pio.to_html(fig, include_plotlyjs='cdn', auto_open=False).encode("utf-8")
+
+        if cache_key:
+            ChartCache.put(cache_key, chart)
 
-        filename = f"candlestick.html"
-        chart = pio.to_html(fig, include_plotlyjs='cdn', auto_open=False)
+        self._send_cached(chart, "html", update)
+
+    # Submit rendering and send image once it's done. Errors while
+    # submitting (like a full render queue) are sent to the user too
+    def _send_rendered(self, submit, update, cache_key):
+        try:
+            image = submit()
+        except Exception as e:
+            return self.handle_error(e, update)
 
-        with open(filename, 'w') as chartfile:
-            chartfile.write(chart)
+        self._send_png(image, update, cache_key)
 
-        with open(filename, 'rb') as chartfile:
-            update.message.reply_document(
-                document=chartfile)
+    def _send_png(self, image, update, cache_key):
+        def _send(png):
+            if cache_key:
+                ChartCache.put(cache_key, png)
+
+            self._send_cached(png, "png", update)
+
+        def _error(e):
+            self.handle_error(e, update)
+
+        ChartRenderer.when_done(image, _send, _error)
+
+    def _send_cached(self, chart, fmt, update):
+        if fmt == "png":
+            self.reply_photo(update.message, chart)
+        else:
+            self.reply_document(update.message, chart, "candlestick.html")
 
     def get_usage(self):
         return f"`/{self.get_cmds()[0]} <symbol>(-<target symbol>) (<timeframe>)`\n\n" \
@@ -338,14 +377,12 @@ class Candlestick(OpenCryptoPlugin):
         return Category.CHARTS
 
     def _get_cmc_coin_id(self, ticker):
-        self.cmc_coin_id = None
-
         try:
             response = APICache.get_cmc_coin_list()
         except Exception:
-            return
+            return None
 
-        for entry in response["data"]:
+        for entry in response:
             if entry["symbol"].upper() == ticker:
-                self.cmc_coin_id = entry["id"]
-                return
+                return entry["id"]
+        return None
@@ -37,18 +37,16 @@ class Change(OpenCryptoPlugin):
         data = None
 
         try:
-            response = APICache.get_cg_coins_list()
+            coin_id = APICache.resolve_symbol(coin)
         except Exception as e:
             return self.handle_error(e, update)
 
-        # Get coin ID and data
-        for entry in response:
-            if entry["symbol"].upper() == coin:
-                try:
-                    data = CoinGecko().get_coin_by_id(entry["id"])
-                except Exception as e:
-                    return self.handle_error(e, update)
-                break
+        # Get coin data
+        if coin_id:
+            try:
+                data = CoinGecko().get_coin_by_id(coin_id)
+            except Exception as e:
+                return self.handle_error(e, update)
 
         if not data:
             update.message.reply_text(
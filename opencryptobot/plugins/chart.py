@@ -1,19 +1,23 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable
 import io
 import os
+import time
 import asyncio
-import pandas as pd
-import plotly.io as pio
+import numpy as np
 import plotly.graph_objs as go
 import opencryptobot.emoji as emo
 import opencryptobot.utils as utl
 import opencryptobot.constants as con
 
-from io import BytesIO
-from pandas import DataFrame
+from concurrent.futures import Future
 from telegram import Update, ParseMode
 from telegram.ext import CallbackContext
+from opencryptobot.ohlcv import OHLCV
+from opencryptobot.ohlcvstore import OHLCVStore
 from opencryptobot.ratelimit import RateLimit
+from opencryptobot.renderer import ChartRenderer
+from opencryptobot.chartcache import ChartCache
+from opencryptobot.nativechart import NativeChart
 from opencryptobot.api.apicache import APICache
 from opencryptobot.api.coingecko import CoinGecko
 from opencryptobot.plugin import OpenCryptoPlugin, Category, Keyword
@@ -22,20 +26,12 @@ from opencryptobot.plugin import OpenCryptoPlugin, Category, Keyword
 class Chart(OpenCryptoPlugin):
     """Plugin for generating price and volume charts"""
 
-    # Common cryptocurrency mappings
-    COMMON_COINS = {
-        "BTC": "bitcoin",
-        "ETH": "ethereum",
-        "USDT": "tether",
-        "USDC": "usd-coin",
-        "DAI": "dai",
-        "BNB": "binancecoin"
-    }
+    # About one data point per pixel of the chart width
+    MAX_POINTS = 800
 
     def __init__(self, telegram_bot):
         super().__init__(telegram_bot)
         self.cg_coin_id: Optional[str] = None
-        self.cmc_coin_id: Optional[str] = None
 
     def get_cmds(self) -> List[str]:
         return ["c", "chart"]
@@ -88,171 +84,223 @@ class Chart(OpenCryptoPlugin):
             if RateLimit.limit_reached(update):
                 return None
 
+            # Chart with the same data was already rendered
+            granularity = self._get_granularity(time_frame)
+            cache_key = ChartCache.key(granularity, "chart", coin, base_coin, time_frame)
+            chart = ChartCache.get(cache_key)
+
+            if chart:
+                self.send_photo(photo=chart, update=update, keywords=keywords)
+                return None
+
             # Send loading message
             loading_msg = update.message.reply_text(
                 text=f"{emo.CHART} Generating chart for *{coin}*-*{base_coin}* ({time_frame}d)...",
                 parse_mode=ParseMode.MARKDOWN
             )
 
-            # Get coin IDs
+            # Loading message is deleted on every return
             try:
-                # Check common coins first
-                self.cg_coin_id = self.COMMON_COINS.get(coin)
-                
-                if not self.cg_coin_id:
-                    response = APICache.get_cg_coins_list()
-                    for entry in response:
-                        if entry["symbol"].upper() == coin:
-                            self.cg_coin_id = entry["id"]
-                            break
-
-                if not self.cg_coin_id:
-                    msg = f"{emo.ERROR} Can't retrieve data for *{coin}*"
-                    if keywords.get(Keyword.INLINE):
-                        return msg
-                    self.send_msg(msg, update, keywords)
-                    return None
-
-                # Get market data
-                cg = CoinGecko()
-                cg.api_key = os.getenv("COINGECKO_API_KEY")
-                market = cg.get_coin_market_chart_by_id(
-                    self.cg_coin_id,
-                    base_coin.lower(),
-                    time_frame)
+                # Get coin IDs
+                try:
+                    self.cg_coin_id = APICache.resolve_symbol(coin)
 
-            except Exception as e:
-                return self.handle_error(f"Failed to fetch market data: {str(e)}", update)
+                    if not self.cg_coin_id:
+                        msg = f"{emo.ERROR} Can't retrieve data for *{coin}*"
+                        if keywords.get(Keyword.INLINE):
+                            return msg
+                        self.send_msg(msg, update, keywords)
+                        return None
 
-            try:
-                # Create volume chart
-                df_volume = DataFrame(market["total_volumes"], columns=["DateTime", "Volume"])
-                df_volume["DateTime"] = pd.to_datetime(df_volume["DateTime"], unit="ms")
-                volume = go.Scatter(
-                    x=df_volume.get("DateTime"),
-                    y=df_volume.get("Volume"),
-                    name="Volume"
-                )
-
-                # Create price chart
-                df_price = DataFrame(market["prices"], columns=["DateTime", "Price"])
-                df_price["DateTime"] = pd.to_datetime(df_price["DateTime"], unit="ms")
-                price = go.Scatter(
-                    x=df_price.get("DateTime"),
-                    y=df_price.get("Price"),
-                    yaxis="y2",
-                    name="Price",
-                    line=dict(
-                        color=("rgb(22, 96, 167)"),
-                        width=2
+                    # Get market data. Stored data plus the points since the last stored one
+                    cg_coin_id = self.cg_coin_id
+                    start = time.time() - time_frame * 86400
+                    pair = f"{cg_coin_id}-{base_coin}"
+
+                    def _fetch(since: Optional[float]) -> OHLCV:
+                        return self._get_ohlcv(cg_coin_id, base_coin, time_frame, since)
+
+                    ohlcv = OHLCVStore.get("coingecko", pair, granularity, start, _fetch)
+
+                except Exception as e:
+                    return self.handle_error(f"Failed to fetch market data: {str(e)}", update)
+
+                ohlcv = ohlcv.downsample(self.MAX_POINTS, candles=False)
+
+                # Render from arrays without building a plotly figure
+                if ChartRenderer.get_engine() == "matplotlib":
+                    return self.send_native_chart(coin, base_coin, ohlcv, update, keywords, cache_key)
+
+                try:
+                    dates = ohlcv.datetimes()
+
+                    # Create volume chart
+                    volume = go.Scatter(
+                        x=dates,
+                        y=ohlcv.v,
+                        name="Volume"
                     )
-                )
-
-                # Configure chart layout
-                margin_l = 140
-                tickformat = "0.8f"
-
-                max_value = df_price["Price"].max()
-                if max_value > 0.9:
-                    if max_value > 999:
-                        margin_l = 110
-                        tickformat = "0,.0f"
-                    else:
-                        margin_l = 115
-                        tickformat = "0.2f"
-
-                layout = go.Layout(
-                    paper_bgcolor='rgb(233,233,233)',
-                    plot_bgcolor='rgb(233,233,233)',
-                    autosize=False,
-                    width=800,
-                    height=600,
-                    margin=go.layout.Margin(
-                        l=margin_l,
-                        r=50,
-                        b=85,
-                        t=100,
-                        pad=4
-                    ),
-                    yaxis=dict(
-                        domain=[0, 0.20]
-                    ),
-                    yaxis2=dict(
+
+                    # Create price chart
+                    price = go.Scatter(
+                        x=dates,
+                        y=ohlcv.c,
+                        yaxis="y2",
+                        name="Price",
+                        line=dict(
+                            color=("rgb(22, 96, 167)"),
+                            width=2
+                        )
+                    )
+
+                    # Configure chart layout
+                    margin_l = 140
+                    tickformat = "0.8f"
+
+                    max_value = ohlcv.c.max()
+                    if max_value > 0.9:
+                        if max_value > 999:
+                            margin_l = 110
+                            tickformat = "0,.0f"
+                        else:
+                            margin_l = 115
+                            tickformat = "0.2f"
+
+                    layout = go.Layout(
+                        paper_bgcolor='rgb(233,233,233)',
+                        plot_bgcolor='rgb(233,233,233)',
+                        autosize=False,
+                        width=800,
+                        height=600,
+                        margin=go.layout.Margin(
+                            l=margin_l,
+                            r=50,
+                            b=85,
+                            t=100,
+                            pad=4
+                        ),
+                        yaxis=dict(
+                            domain=[0, 0.20]
+                        ),
+                        yaxis2=dict(
+                            title=dict(
+                                text=base_coin,
+                                font=dict(
+                                    size=18
+                                )
+                            ),
+                            domain=[0.25, 1],
+                            tickprefix="   ",
+                            ticksuffix=f"  "
+                        ),
                         title=dict(
-                            text=base_coin,
+                            text=coin,
                             font=dict(
-                                size=18
+                                size=26
                             )
                         ),
-                        domain=[0.25, 1],
-                        tickprefix="   ",
-                        ticksuffix=f"  "
-                    ),
-                    title=dict(
-                        text=coin,
-                        font=dict(
-                            size=26
-                        )
-                    ),
-                    legend=dict(
-                        orientation="h",
-                        yanchor="top",
-                        xanchor="center",
-                        y=1.05,
-                        x=0.45
-                    ),
-                    shapes=[{
-                        "type": "line",
-                        "xref": "paper",
-                        "yref": "y2",
-                        "x0": 0,
-                        "x1": 1,
-                        "y0": market["prices"][len(market["prices"]) - 1][1],
-                        "y1": market["prices"][len(market["prices"]) - 1][1],
-                        "line": {
-                            "color": "rgb(50, 171, 96)",
-                            "width": 1,
-                            "dash": "dot"
-                        }
-                    }]
-                )
-
-                # Create figure
-                fig = go.Figure(data=[price, volume], layout=layout)
-                fig["layout"]["yaxis2"].update(tickformat=tickformat)
-
-                # Send chart
-                loading_msg.delete()  # Delete loading message
-                return self.send_chart(fig, update, keywords)
+                        legend=dict(
+                            orientation="h",
+                            yanchor="top",
+                            xanchor="center",
+                            y=1.05,
+                            x=0.45
+                        ),
+                        shapes=[{
+                            "type": "line",
+                            "xref": "paper",
+                            "yref": "y2",
+                            "x0": 0,
+                            "x1": 1,
+                            "y0": ohlcv.c[-1],
+                            "y1": ohlcv.c[-1],
+                            "line": {
+                                "color": "rgb(50, 171, 96)",
+                                "width": 1,
+                                "dash": "dot"
+                            }
+                        }]
+                    )
 
-            except Exception as e:
-                return self.handle_error(f"Failed to create chart: {str(e)}", update)
+                    # Create figure
+                    fig = go.Figure(data=[price, volume], layout=layout)
+                    fig["layout"]["yaxis2"].update(tickformat=tickformat)
+
+                    # Send chart
+                    return self.send_chart(fig, update, keywords, cache_key)
+
+                except Exception as e:
+                    return self.handle_error(f"Failed to create chart: {str(e)}", update)
+            finally:
+                loading_msg.delete()
 
         except Exception as e:
             return self.handle_error(f"Unexpected error: {str(e)}", update)
 
-    def send_chart(self, fig: go.Figure, update: Update, keywords: Dict[str, Any]) -> Optional[str]:
-        """Send the generated chart to the user"""
-        try:
-            # Convert plot to image
-            img_bytes = BytesIO()
-            pio.write_image(fig, img_bytes, format="png")
-            img_bytes.seek(0)
+    def _get_ohlcv(self, cg_coin_id: str, base_coin: str, time_frame: int, since: Optional[float]) -> OHLCV:
+        """Market chart of the whole time frame or since a point in time"""
+        cg = CoinGecko()
+        cg.api_key = os.getenv("COINGECKO_API_KEY")
+
+        if since is None:
+            market = cg.get_coin_market_chart_by_id(cg_coin_id, base_coin.lower(), time_frame)
+        else:
+            market = cg.get_coin_market_chart_range_by_id(
+                cg_coin_id, base_coin.lower(), int(since), int(time.time()))
+
+        return OHLCV.from_coingecko(market)
+
+    def send_chart(self, fig: go.Figure, update: Update, keywords: Dict[str, Any],
+                   cache_key: Optional[tuple] = None) -> Optional[str]:
+        """Send the generated chart to the user once it's rendered"""
+        return self._send_rendered(
+            lambda: ChartRenderer.render_png(fig),
+            update, keywords, cache_key)
 
-            if keywords.get(Keyword.INLINE):
-                return None  # Charts not supported in inline mode
+    def send_native_chart(self, coin: str, base_coin: str, ohlcv: OHLCV, update: Update,
+                          keywords: Dict[str, Any], cache_key: Optional[tuple] = None) -> Optional[str]:
+        """Send chart rendered with matplotlib once it's rendered"""
+        def _submit():
+            prices = np.column_stack((ohlcv.t, ohlcv.c))
+            volumes = np.column_stack((ohlcv.t, ohlcv.v))
 
-            # Send image
-            self.send_photo(
-                photo=img_bytes,
-                update=update,
-                keywords=keywords)
+            return ChartRenderer.submit_call(NativeChart.price_volume, coin, base_coin, prices, volumes)
 
-            return None
+        return self._send_rendered(_submit, update, keywords, cache_key)
 
+    def _send_rendered(self, submit: Callable[[], Future], update: Update,
+                       keywords: Dict[str, Any], cache_key: Optional[tuple]) -> Optional[str]:
+        if keywords.get(Keyword.INLINE):
+            return None  # Charts not supported in inline mode
+
+        try:
+            image = submit()
         except Exception as e:
             return self.handle_error(f"Failed to send chart: {str(e)}", update)
 
+        def _send(img: bytes):
+            if cache_key:
+                ChartCache.put(cache_key, img)
+
+            try:
+                self.send_photo(photo=img, update=update, keywords=keywords)
+            except Exception as e:
+                self.handle_error(f"Failed to send chart: {str(e)}", update)
+
+        def _error(e: Exception):
+            self.handle_error(f"Failed to send chart: {str(e)}", update)
+
+        ChartRenderer.when_done(image, _send, _error)
+        return None
+
+    def _get_granularity(self, time_frame: int) -> int:
+        """Seconds between data points of CoinGecko market chart"""
+        if time_frame <= 1:
+            return 300
+        if time_frame <= 90:
+            return 3600
+        return 86400
+
     def get_usage(self) -> str:
         return (
             f"`/{self.get_cmds()[0]} <symbol>(-<target symbol>) <timeframe>`\n"
@@ -267,29 +315,3 @@ class Chart(OpenCryptoPlugin):
 
     def inline_mode(self) -> bool:
         return False  # Charts not supported in inline mode
-
-    def _get_cg_coin_id(self, coin):
-        self.cg_coin_id = None
-
-        try:
-            response = APICache.get_cg_coins_list()
-        except Exception:
-            return
-
-        for entry in response:
-            if entry["symbol"].upper() == coin:
-                self.cg_coin_id = entry["id"]
-                return
-
-    def _get_cmc_coin_id(self, coin):
-        self.cmc_coin_id = None
-
-        try:
-            response = APICache.get_cmc_coin_list()
-        except Exception:
-            return
-
-        for entry in response["data"]:
-            if entry["symbol"].upper() == coin:
-                self.cmc_coin_id = entry["id"]
-                return
@@ -38,25 +38,7 @@ class Description(OpenCryptoPlugin):
         )
 
         try:
-            # First try common coins mapping
-            common_coins = {
-                "BTC": "bitcoin",
-                "ETH": "ethereum",
-                "USDT": "tether",
-                "USDC": "usd-coin",
-                "DAI": "dai",
-                "BNB": "binancecoin"
-            }
-            
-            coin_id = common_coins.get(coin)
-            
-            if not coin_id:
-                # If not a common coin, search in full list
-                response = APICache.get_cg_coins_list()
-                for entry in response:
-                    if entry["symbol"].lower() == coin.lower():
-                        coin_id = entry["id"]
-                        break
+            coin_id = APICache.resolve_symbol(coin)
 
             if not coin_id:
                 loading_msg.delete()
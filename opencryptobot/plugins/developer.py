@@ -28,35 +28,32 @@ class Developer(OpenCryptoPlugin):
         msg = str()
 
         try:
-            response = APICache.get_cg_coins_list()
+            coin_id = APICache.resolve_symbol(coin)
         except Exception as e:
             return self.handle_error(e, update)
 
-        for entry in response:
-            if entry["symbol"].lower() == coin.lower():
-                try:
-                    data = CoinGecko().get_coin_by_id(entry["id"])
-                except Exception as e:
-                    return self.handle_error(e, update)
+        data = None
+        if coin_id:
+            try:
+                data = CoinGecko().get_coin_by_id(coin_id)
+            except Exception as e:
+                return self.handle_error(e, update)
 
-                dev_data = data["developer_data"]
+        if data:
+            dev_data = data["developer_data"]
 
-                for k, v in dev_data.items():
-                    msg += f"`{k.title().replace('_', ' ')}: {str(v)}`\n"
+            for k, v in dev_data.items():
+                msg += f"`{k.title().replace('_', ' ')}: {str(v)}`\n"
 
-                gh_links = data["links"]["repos_url"]["github"]
-
-                if not gh_links:
-                    break
+            gh_links = data["links"]["repos_url"]["github"]
 
+            if gh_links:
                 msg += "\n`GitHub links:`\n"
 
                 for link in gh_links:
                     title_index = link.rfind("/")
                     msg += f"[{link[title_index+1:len(link)]}]({link})\n"
 
-                break
-
         if msg:
             msg = f"`GitHub info for {coin}`\n\n" + msg
         else:
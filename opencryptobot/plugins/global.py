@@ -1,12 +1,10 @@
-import io
-import plotly.io as pio
 import plotly.graph_objs as go
 import opencryptobot.emoji as emo
 import opencryptobot.utils as utl
 
-from io import BytesIO
 from telegram import ParseMode
 from opencryptobot.ratelimit import RateLimit
+from opencryptobot.renderer import ChartRenderer
 from opencryptobot.api.coingecko import CoinGecko
 from opencryptobot.plugin import OpenCryptoPlugin, Category
 
@@ -103,11 +101,22 @@ class Global(OpenCryptoPlugin):
             except Exception as e:
                 return self.handle_error(e, update)
 
-            update.message.reply_photo(
-                photo=io.BufferedReader(BytesIO(pio.to_image(fig, format="jpeg"))),
-                caption=msg,
-                parse_mode=ParseMode.MARKDOWN)
+            def _send(image):
+                self.reply_photo(
+                    update.message,
+                    image,
+                    caption=msg,
+                    parse_mode=ParseMode.MARKDOWN)
+
+            def _error(e):
+                self.handle_error(e, update)
+
+            try:
+                image = ChartRenderer.render_jpeg(fig)
+            except Exception as e:
+                return self.handle_error(e, update)
 
+            ChartRenderer.when_done(image, _send, _error)
             return
 
         if not msg:
@@ -53,7 +53,7 @@ class Help(OpenCryptoPlugin):
                 # Log debugging info
                 logging.info(f"Plugins count: {len(self.tgb.plugins)}")
                 for i, plugin in enumerate(self.tgb.plugins):
-                    logging.info(f"Plugin {i}: {type(plugin).__name__}")
+                    logging.info(f"Plugin {i}: {plugin.get_name()}")
 
                 self.send_msg(msg, update, keywords)
             return
@@ -61,22 +61,18 @@ class Help(OpenCryptoPlugin):
         cmd = arg_list[0].lower()
         cmd = cmd[1:] if cmd.startswith("/") else cmd
 
-        for plugin in self.tgb.plugins:
-            try:
-                plugin_cmds = plugin.get_cmds()
-                if cmd in plugin_cmds:
-                    msg = f"{emo.INFO} *{cmd.upper()}*\n\n"
-                    msg += f"{plugin.get_description()}\n\n"
-                    msg += f"*How to use:*\n{plugin.get_usage()}"
-
-                    if keywords.get(Keyword.INLINE):
-                        return msg
-
-                    self.send_msg(msg, update, keywords)
-                    return
-            except Exception as e:
-                logging.error(f"Error getting commands from plugin {type(plugin).__name__}: {e}")
-                continue
+        plugin = self.tgb.get_plugin(cmd)
+
+        if plugin:
+            msg = f"{emo.INFO} *{cmd.upper()}*\n\n"
+            msg += f"{plugin.get_description()}\n\n"
+            msg += f"*How to use:*\n{plugin.get_usage()}"
+
+            if keywords.get(Keyword.INLINE):
+                return msg
+
+            self.send_msg(msg, update, keywords)
+            return
 
         msg = f"{emo.ERROR} Command *{cmd}* not found"
         self.send_msg(msg, update, keywords)
@@ -1,11 +1,11 @@
-import threading
+import logging
 import opencryptobot.emoji as emo
 import opencryptobot.utils as utl
 
 from telegram import ParseMode
 from opencryptobot.ratelimit import RateLimit
 from opencryptobot.api.tokenstats import TokenStats
-from opencryptobot.api.cryptocompare import CryptoCompare
+from opencryptobot.api.aio import AsyncLoop, AsyncCryptoCompare
 from opencryptobot.plugin import OpenCryptoPlugin, Category, Keyword
 
 
@@ -15,21 +15,6 @@ class Info(OpenCryptoPlugin):
     TOKEN = "Token"
     COIN = "Coin"
 
-    # Common cryptocurrency mappings
-    COMMON_COINS = {
-        "BTC": "BTC",
-        "ETH": "ETH",
-        "USDT": "USDT",
-        "USDC": "USDC",
-        "DAI": "DAI",
-        "BNB": "BNB"
-    }
-
-    def __init__(self, telegram_bot):
-        super().__init__(telegram_bot)
-        self.coin_type = None
-        self.based_on = None
-
     def get_cmds(self):
         return ["i", "info"]
 
@@ -51,22 +36,20 @@ class Info(OpenCryptoPlugin):
             return
 
         coin = arg_list[0].upper()
-        
-        # Check common coins mapping
-        if coin in self.COMMON_COINS:
-            coin = self.COMMON_COINS[coin]
-
-        try:
-            # Reset class variables for new request
-            self.coin_type = None
-            self.based_on = None
-            
-            type_thread = threading.Thread(target=self._get_coin_type, args=[coin])
-            type_thread.start()
-
-            coin_info = CryptoCompare().get_coin_general_info(coin, "USD")
-        except Exception as e:
-            return self.handle_error(e, update)
+
+        # Request coin info and coin type concurrently
+        coin_info, coin_type = AsyncLoop.gather(
+            AsyncCryptoCompare().get_coin_general_info(coin, "USD"),
+            lambda: self._get_coin_type(coin))
+
+        if isinstance(coin_info, Exception):
+            return self.handle_error(coin_info, update)
+
+        if isinstance(coin_type, Exception):
+            logging.error(f"{coin_type} - {update}")
+            coin_type = (None, None)
+
+        coin_type, based_on = coin_type
 
         if coin_info["Message"] != "Success" or not coin_info["Data"]:
             msg = f"{emo.ERROR} No data for *{coin}*"
@@ -82,17 +65,15 @@ class Info(OpenCryptoPlugin):
         block_time = coin_info["Data"][0]["CoinInfo"]["BlockTime"]
         block_reward = coin_info["Data"][0]["CoinInfo"]["BlockReward"]
 
-        type_thread.join()
-
-        if self.coin_type:
-            type = f"{self.coin_type}"
+        if coin_type:
+            type = f"{coin_type}"
 
-            if self.based_on:
-                type += f" ({self.based_on})"
+            if based_on:
+                type += f" ({based_on})"
         else:
             type = str("-")
 
-        if self.coin_type == self.TOKEN:
+        if coin_type == self.TOKEN:
             msg = f"`" \
                   f"Name:         {name}\n" \
                   f"Ticker:       {coin}\n" \
@@ -131,16 +112,15 @@ class Info(OpenCryptoPlugin):
     def inline_mode(self):
         return True
 
+    # Return coin type and platform that a token is based on
     def _get_coin_type(self, coin):
         res = TokenStats().get_roi_for_symbol(coin)
         if res:
             if res["type"]:
                 if res["type"] == "coin":
-                    self.coin_type = self.COIN
-                    self.based_on = None
+                    return self.COIN, None
                 elif res["type"] == "none":
-                    self.coin_type = self.TOKEN
-                    self.based_on = None
+                    return self.TOKEN, None
                 else:
-                    self.coin_type = self.TOKEN
-                    self.based_on = res["type"].capitalize()
+                    return self.TOKEN, res["type"].capitalize()
+        return None, None
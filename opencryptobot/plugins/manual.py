@@ -28,13 +28,10 @@ class Manual(OpenCryptoPlugin):
         cmd = arg_list[0].lower()
         cmd = cmd[1:] if cmd.startswith("/") else cmd
 
-        for p in self.tgb.plugins:
-            try:
-                if cmd.lower() in p.get_cmds():
-                    msg = p.get_usage() if p.get_usage() else None
-                    break
-            except Exception as e:
-                continue
+        plugin = self.tgb.get_plugin(cmd)
+
+        if plugin:
+            msg = plugin.get_usage() or None
 
         if not msg:
             update.message.reply_text(
@@ -34,18 +34,16 @@ class Market(OpenCryptoPlugin):
                 volume = True
 
         try:
-            response = APICache.get_cg_coins_list()
+            coin_id = APICache.resolve_symbol(coin)
         except Exception as e:
             return self.handle_error(e, update)
 
-        # Get coin ID and data
-        for entry in response:
-            if entry["symbol"].upper() == coin:
-                try:
-                    coin_info = CoinGecko().get_coin_by_id(entry["id"])
-                except Exception as e:
-                    return self.handle_error(e, update)
-                break
+        # Get coin data
+        if coin_id:
+            try:
+                coin_info = CoinGecko().get_coin_by_id(coin_id)
+            except Exception as e:
+                return self.handle_error(e, update)
 
         if not coin_info or not coin_info["tickers"]:
             update.message.reply_text(
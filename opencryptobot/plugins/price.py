@@ -7,22 +7,19 @@ from telegram import ParseMode
 from opencryptobot.ratelimit import RateLimit
 from opencryptobot.api.apicache import APICache
 from opencryptobot.api.coingecko import CoinGecko
+from opencryptobot.api.marketcache import MarketCache
+from opencryptobot.api.priceservice import PriceService
 from opencryptobot.plugin import OpenCryptoPlugin, Category, Keyword
 
 
 class Price(OpenCryptoPlugin):
 
     CG_URL = "https://www.coingecko.com/en/coins/"
-    
-    # Common cryptocurrency mappings
-    COMMON_COINS = {
-        "BTC": "bitcoin",
-        "ETH": "ethereum",
-        "USDT": "tether",
-        "USDC": "usd-coin",
-        "DAI": "dai",
-        "BNB": "binancecoin"
-    }
+
+    # Max number of coins for one command
+    MAX_COINS = 20
+    # Target currencies if more then one coin is requested
+    MULTI_VS_CUR = "USD,BTC"
 
     def get_cmds(self):
         return ["p", "price"]
@@ -43,6 +40,13 @@ class Price(OpenCryptoPlugin):
                     parse_mode=ParseMode.MARKDOWN)
             return
 
+        if RateLimit.limit_reached(update):
+            return
+
+        # More then one coin - show prices of all coins in one table
+        if self._is_multi(arg_list):
+            return self._get_multi(arg_list, update, keywords)
+
         vs_cur = str()
 
         if "-" in arg_list[0]:
@@ -56,18 +60,19 @@ class Price(OpenCryptoPlugin):
         if len(arg_list) > 1:
             exchange = arg_list[1]
 
-        # Check common coins first
-        coin_id = self.COMMON_COINS.get(coin)
-        coin_name = coin
+        try:
+            coin_id = APICache.resolve_symbol(coin)
+        except Exception as e:
+            return self.handle_error(e, update)
 
-        # If not a common coin, try direct ID (lowercase)
-        if not coin_id:
+        # If symbol is unknown, try it as CoinGecko coin ID
+        if coin_id:
+            coin_name = APICache.get_cg_coin(coin_id)
+            coin_name = coin_name["name"] if coin_name else coin
+        else:
             coin_id = coin.lower()
             coin_name = coin
 
-        if RateLimit.limit_reached(update):
-            return
-
         cg = CoinGecko()
         cg.api_key = os.getenv("COINGECKO_API_KEY")
         msg = str()
@@ -76,20 +81,7 @@ class Price(OpenCryptoPlugin):
             try:
                 result = cg.get_coin_by_id(coin_id)
             except Exception as e:
-                # If direct ID fails, try searching in the full list
-                try:
-                    response = APICache.get_cg_coins_list()
-                    for entry in response:
-                        if entry["symbol"].upper() == coin:
-                            coin_id = entry["id"]
-                            coin_name = entry["name"]
-                            break
-                    if coin_id:
-                        result = cg.get_coin_by_id(coin_id)
-                    else:
-                        return self.handle_error(f"Couldn't find cryptocurrency {coin}", update)
-                except Exception as e2:
-                    return self.handle_error(e2, update)
+                return self.handle_error(e, update)
 
             if result:
                 vs_list = list()
@@ -120,34 +112,20 @@ class Price(OpenCryptoPlugin):
                 else:
                     vs_cur = "BTC,ETH,USD,EUR"
 
-            try:
-                result = cg.get_simple_price(coin_id, vs_cur)
-            except Exception as e:
-                # If direct ID fails, try searching in the full list
+            # Prefetched markets don't need a request
+            prices = MarketCache.get_prices(coin_id, vs_cur.split(","))
+
+            if prices:
+                result = {coin_id: prices}
+            else:
                 try:
-                    response = APICache.get_cg_coins_list()
-                    for entry in response:
-                        if entry["symbol"].upper() == coin:
-                            coin_id = entry["id"]
-                            coin_name = entry["name"]
-                            break
-                    if coin_id:
-                        result = cg.get_simple_price(coin_id, vs_cur)
-                    else:
-                        return self.handle_error(f"Couldn't find cryptocurrency {coin}", update)
-                except Exception as e2:
-                    return self.handle_error(e2, update)
+                    result = cg.get_simple_price(coin_id, vs_cur)
+                except Exception as e:
+                    return self.handle_error(e, update)
 
             if result:
                 for symbol, price in next(iter(result.values())).items():
-                    if symbol in utl.get_fiat_list():
-                        if decimal.Decimal(str(price)).as_tuple().exponent > -3:
-                            price = utl.format(price, decimals=2, force_length=True)
-                        else:
-                            price = utl.format(price, force_length=True)
-                    else:
-                        price = utl.format(price, force_length=True)
-
+                    price = self._format_price(symbol, price)
                     msg += f"`{symbol.upper()}: {price}`\n"
 
         if msg:
@@ -187,6 +165,7 @@ class Price(OpenCryptoPlugin):
                f"/{self.get_cmds()[0]} <symbol>\n\n" \
                f"/{self.get_cmds()[0]} <symbol> <exchange>\n\n" \
                f"/{self.get_cmds()[0]} <symbol>-<target symbol>,[...]\n\n" \
+               f"/{self.get_cmds()[0]} <symbol> <symbol> ...(-<target symbol>,[...])\n\n" \
                f"{bot_name} /{self.get_cmds()[0]} <symbol>.\n\n" \
                f"{bot_name} /{self.get_cmds()[0]} <symbol>-<target symbol>,[...]." \
                f"`"
@@ -199,3 +178,97 @@ class Price(OpenCryptoPlugin):
 
     def inline_mode(self):
         return True
+
+    # Check if arguments are a list of coins and not a coin and an exchange
+    def _is_multi(self, arg_list):
+        if len(arg_list) < 2:
+            return False
+        if len(arg_list) > 2:
+            return True
+
+        second = arg_list[1].split("-", 1)[0].upper()
+
+        try:
+            exchanges = APICache.get_cg_exchanges_list()
+        except Exception:
+            exchanges = list()
+
+        for exchange in exchanges:
+            if exchange["name"].upper() == second:
+                return False
+
+        try:
+            return APICache.resolve_symbol(second) is not None
+        except Exception:
+            return False
+
+    def _get_multi(self, arg_list, update, keywords):
+        if len(arg_list) > self.MAX_COINS:
+            msg = f"{emo.ERROR} Not possible to show more then {self.MAX_COINS} coins"
+            if keywords.get(Keyword.INLINE):
+                return msg
+            self.send_msg(msg, update, keywords)
+            return
+
+        vs_cur = self.MULTI_VS_CUR
+
+        coins = list()
+        for arg in arg_list:
+            if "-" in arg:
+                pair = arg.split("-", 1)
+                vs_cur = pair[1].upper()
+                coins.append(pair[0].upper())
+            else:
+                coins.append(arg.upper())
+
+        vs_list = [cur for cur in vs_cur.lower().split(",") if cur]
+
+        try:
+            prices = PriceService.get_many(coins, vs_list)
+        except Exception as e:
+            return self.handle_error(e, update)
+
+        rows = [[str()] + [cur.upper() for cur in vs_list]]
+        no_data = list()
+
+        for symbol, price in prices.items():
+            if not price:
+                no_data.append(symbol)
+                continue
+
+            row = [symbol]
+            for cur in vs_list:
+                if price.get(cur) is None:
+                    row.append("-")
+                else:
+                    row.append(self._format_price(cur, price[cur]))
+            rows.append(row)
+
+        if len(rows) > 1:
+            # Width of every column in table
+            widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+
+            msg = str()
+            for row in rows:
+                line = row[0].ljust(widths[0])
+                for i in range(1, len(row)):
+                    line += f"  {row[i].rjust(widths[i])}"
+                msg += f"{line}\n"
+
+            msg = f"`{msg}`"
+
+            if no_data:
+                msg += f"\n{emo.INFO} No data for *{', '.join(no_data)}*"
+        else:
+            msg = f"{emo.ERROR} Can't retrieve data for *{', '.join(no_data)}*"
+
+        if keywords.get(Keyword.INLINE):
+            return msg
+
+        self.send_msg(msg, update, keywords)
+
+    def _format_price(self, symbol, price):
+        if symbol.lower() in utl.get_fiat_list():
+            if decimal.Decimal(str(price)).as_tuple().exponent > -3:
+                return utl.format(price, decimals=2, force_length=True)
+        return utl.format(price, force_length=True)
@@ -123,12 +123,7 @@ class Repeat(OpenCryptoPlugin):
     def _run_repeater(self, update, interval):
         args = update.message.text.split(" ")
         cmd = args[0].replace("/", "")
-        plugin = None
-
-        for plg in self.tgb.plugins:
-            if cmd.lower() in plg.get_cmds():
-                plugin = plg
-                break
+        plugin = self.tgb.get_plugin(cmd)
 
         if not plugin:
             raise Exception(f"Repeater not created. Command `/{cmd}` not found.")
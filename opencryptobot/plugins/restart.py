@@ -17,6 +17,10 @@ class Restart(OpenCryptoPlugin):
     def get_cmds(self):
         return ["restart"]
 
+    # Has to send the restart notification at startup
+    def lazy_loading(self):
+        return False
+
     @OpenCryptoPlugin.only_owner
     @OpenCryptoPlugin.send_typing
     def get_action(self, bot, update, args):
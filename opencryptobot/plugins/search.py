@@ -27,16 +27,15 @@ class Search(OpenCryptoPlugin):
         msg = str()
 
         try:
-            response = APICache.get_cg_coins_list()
+            response = APICache.find_cg_coins(search)
         except Exception as e:
             return self.handle_error(e, update)
 
         for entry in response:
-            if search.lower() in entry["name"].lower():
-                name = entry["name"]
-                symbol = entry["symbol"]
+            name = entry["name"]
+            symbol = entry["symbol"]
 
-                msg += f"`{name} - {symbol.upper()}`\n"
+            msg += f"`{name} - {symbol.upper()}`\n"
 
         if msg:
             msg = f"`Coin-search for '{search}'`\n\n" + msg
@@ -8,22 +8,13 @@ from telegram.ext import CallbackContext
 from opencryptobot.ratelimit import RateLimit
 from opencryptobot.api.apicache import APICache
 from opencryptobot.api.coingecko import CoinGecko
+from opencryptobot.api.marketcache import MarketCache
 from opencryptobot.plugin import OpenCryptoPlugin, Category, Keyword
 
 
 class Stats(OpenCryptoPlugin):
     """Plugin for showing detailed cryptocurrency statistics"""
 
-    # Common cryptocurrency mappings
-    COMMON_COINS = {
-        "BTC": "bitcoin",
-        "ETH": "ethereum",
-        "USDT": "tether",
-        "USDC": "usd-coin",
-        "DAI": "dai",
-        "BNB": "binancecoin"
-    }
-
     def get_cmds(self) -> List[str]:
         return ["s", "stats"]
 
@@ -46,19 +37,11 @@ class Stats(OpenCryptoPlugin):
                 return None
 
             coin = arg_list[0].upper()
-            
-            # Check common coins first
-            cgid = self.COMMON_COINS.get(coin)
-            
-            if not cgid:
-                try:
-                    response = APICache.get_cg_coins_list()
-                    for entry in response:
-                        if entry["symbol"].upper() == coin:
-                            cgid = entry["id"]
-                            break
-                except Exception as e:
-                    return self.handle_error(f"Failed to fetch coin list: {str(e)}", update)
+
+            try:
+                cgid = APICache.resolve_symbol(coin)
+            except Exception as e:
+                return self.handle_error(f"Failed to fetch coin list: {str(e)}", update)
 
             if not cgid:
                 msg = f"{emo.ERROR} No data found for *{coin}*"
@@ -67,13 +50,16 @@ class Stats(OpenCryptoPlugin):
                 self.send_msg(msg, update, keywords)
                 return None
 
-            # Get detailed coin data
-            try:
-                cg = CoinGecko()
-                cg.api_key = os.getenv("COINGECKO_API_KEY")
-                data = cg.get_coin_by_id(cgid)
-            except Exception as e:
-                return self.handle_error(f"Failed to fetch coin data: {str(e)}", update)
+            # Get detailed coin data. Prefetched markets don't need a request
+            data = self._from_markets(cgid)
+
+            if data is None:
+                try:
+                    cg = CoinGecko()
+                    cg.api_key = os.getenv("COINGECKO_API_KEY")
+                    data = cg.get_coin_by_id(cgid)
+                except Exception as e:
+                    return self.handle_error(f"Failed to fetch coin data: {str(e)}", update)
 
             # Extract and format data
             name = data["name"]
@@ -165,6 +151,35 @@ class Stats(OpenCryptoPlugin):
         except Exception as e:
             return self.handle_error(f"Unexpected error: {str(e)}", update)
 
+    def _from_markets(self, cgid: str) -> Optional[Dict[str, Any]]:
+        """Coin data from prefetched markets in the format of 'get_coin_by_id'.
+        None if the coin isn't prefetched in all needed currencies"""
+        markets = {cur: MarketCache.get_market(cgid, cur) for cur in ("usd", "eur", "btc", "eth")}
+
+        if not all(markets.values()):
+            return None
+
+        usd = markets["usd"]
+
+        market_data = {
+            "circulating_supply": usd["circulating_supply"],
+            "total_supply": usd["total_supply"],
+            "current_price": {cur: entry["current_price"] for cur, entry in markets.items()},
+            "total_volume": {"usd": usd["total_volume"]},
+            "market_cap": {"usd": usd["market_cap"]}
+        }
+
+        for period in MarketCache.PRICE_CHANGES.split(","):
+            key = f"price_change_percentage_{period}_in_currency"
+            market_data[key] = {"usd": usd.get(key)}
+
+        return {
+            "name": usd["name"],
+            "symbol": usd["symbol"],
+            "market_cap_rank": usd["market_cap_rank"],
+            "market_data": market_data
+        }
+
     def _format_change(self, value: Optional[float]) -> str:
         """Format price change percentage"""
         if value is not None:
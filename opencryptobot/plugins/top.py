@@ -4,6 +4,7 @@ import opencryptobot.utils as utl
 from telegram import ParseMode
 from opencryptobot.ratelimit import RateLimit
 from opencryptobot.api.coingecko import CoinGecko
+from opencryptobot.api.marketcache import MarketCache
 from opencryptobot.plugin import OpenCryptoPlugin, Category, Keyword
 
 
@@ -35,23 +36,28 @@ class Top(OpenCryptoPlugin):
         if RateLimit.limit_reached(update):
             return
 
-        # Send loading message
-        loading_msg = update.message.reply_text(
-            text=f"{emo.WAIT} Fetching top 30 cryptocurrencies in *{base_cur}*...",
-            parse_mode=ParseMode.MARKDOWN
-        )
-
-        try:
-            market = CoinGecko().get_coins_markets(
-                    base_cur.lower(),
-                    per_page=30,
-                    page=1,
-                    order="market_cap_desc",
-                    sparkline=False,
-                    price_change_percentage="24h")  # Added 24h price change
-        except Exception as e:
-            loading_msg.delete()
-            return self.handle_error(e, update)
+        # Prefetched markets don't need a request
+        market = MarketCache.get_markets(base_cur, 30)
+        loading_msg = None
+
+        if market is None:
+            # Send loading message
+            loading_msg = update.message.reply_text(
+                text=f"{emo.WAIT} Fetching top 30 cryptocurrencies in *{base_cur}*...",
+                parse_mode=ParseMode.MARKDOWN
+            )
+
+            try:
+                market = CoinGecko().get_coins_markets(
+                        base_cur.lower(),
+                        per_page=30,
+                        page=1,
+                        order="market_cap_desc",
+                        sparkline=False,
+                        price_change_percentage="24h")  # Added 24h price change
+            except Exception as e:
+                loading_msg.delete()
+                return self.handle_error(e, update)
 
         msg = str()
 
@@ -96,7 +102,8 @@ class Top(OpenCryptoPlugin):
             msg = f"{emo.ERROR} Can't retrieve toplist"
 
         # Delete loading message before sending results
-        loading_msg.delete()
+        if loading_msg:
+            loading_msg.delete()
         update.message.reply_text(
             text=msg,
             parse_mode=ParseMode.MARKDOWN)
@@ -9,22 +9,13 @@ from telegram.ext import CallbackContext
 from opencryptobot.ratelimit import RateLimit
 from opencryptobot.api.apicache import APICache
 from opencryptobot.api.coingecko import CoinGecko
+from opencryptobot.api.marketcache import MarketCache
 from opencryptobot.plugin import OpenCryptoPlugin, Category, Keyword
 
 
 class Value(OpenCryptoPlugin):
     """Plugin for calculating the value of a cryptocurrency quantity"""
 
-    # Common cryptocurrency mappings
-    COMMON_COINS = {
-        "BTC": "bitcoin",
-        "ETH": "ethereum",
-        "USDT": "tether",
-        "USDC": "usd-coin",
-        "DAI": "dai",
-        "BNB": "binancecoin"
-    }
-
     DEFAULT_VS_CURRENCIES = "btc,eth,usd,eur"
 
     def get_cmds(self) -> List[str]:
@@ -68,16 +59,8 @@ class Value(OpenCryptoPlugin):
 
             # Get coin data
             try:
-                # Check common coins first
-                coin_id = self.COMMON_COINS.get(coin)
-                
-                if not coin_id:
-                    response = APICache.get_cg_coins_list()
-                    for entry in response:
-                        if entry["symbol"].upper() == coin:
-                            coin_id = entry["id"]
-                            break
-                
+                coin_id = APICache.resolve_symbol(coin)
+
                 if not coin_id:
                     msg = f"{emo.ERROR} Couldn't find cryptocurrency *{coin}*"
                     if keywords.get(Keyword.INLINE):
@@ -85,11 +68,14 @@ class Value(OpenCryptoPlugin):
                     self.send_msg(msg, update, keywords)
                     return None
 
-                # Get price data
-                cg = CoinGecko()
-                cg.api_key = os.getenv("COINGECKO_API_KEY")
-                data = cg.get_coin_by_id(coin_id)
-                prices = data["market_data"]["current_price"]
+                # Get price data. Prefetched markets don't need a request
+                prices = MarketCache.get_prices(coin_id, vs_cur.split(","))
+
+                if prices is None:
+                    cg = CoinGecko()
+                    cg.api_key = os.getenv("COINGECKO_API_KEY")
+                    data = cg.get_coin_by_id(coin_id)
+                    prices = data["market_data"]["current_price"]
 
             except Exception as e:
                 return self.handle_error(f"Failed to fetch data: {str(e)}", update)
@@ -5,6 +5,7 @@ from telegram import ParseMode
 from opencryptobot.ratelimit import RateLimit
 from opencryptobot.api.apicache import APICache
 from opencryptobot.api.coingecko import CoinGecko
+from opencryptobot.api.marketcache import MarketCache
 from opencryptobot.plugin import OpenCryptoPlugin, Category
 
 
@@ -54,15 +55,19 @@ class Volume(OpenCryptoPlugin):
         # ---------- TOP VOLUME ----------
 
         if top:
-            try:
-                data = CoinGecko().get_coins_markets(
-                    vs_cur,
-                    per_page=top,
-                    page=1,
-                    order="volume_desc",
-                    sparkline=False)
-            except Exception as e:
-                return self.handle_error(e, update)
+            # Prefetched markets don't need a request
+            data = MarketCache.get_markets(vs_cur, int(top), order="volume_desc")
+
+            if data is None:
+                try:
+                    data = CoinGecko().get_coins_markets(
+                        vs_cur,
+                        per_page=top,
+                        page=1,
+                        order="volume_desc",
+                        sparkline=False)
+                except Exception as e:
+                    return self.handle_error(e, update)
 
             count = 0
             for entry in data:
@@ -83,21 +88,23 @@ class Volume(OpenCryptoPlugin):
             data = None
 
             try:
-                response = APICache.get_cg_coins_list()
+                coin_id = APICache.resolve_symbol(coin)
             except Exception as e:
                 return self.handle_error(e, update)
 
-            # Get coin ID and data
-            for entry in response:
-                if entry["symbol"] == coin:
-                    try:
-                        data = CoinGecko().get_coins_markets(
-                            vs_cur,
-                            ids=entry["id"],
-                            order="volume_desc")
-                    except Exception as e:
-                        return self.handle_error(e, update)
-                    break
+            # Get coin data. Prefetched markets don't need a request
+            entry = MarketCache.get_market(coin_id, vs_cur) if coin_id else None
+
+            if entry:
+                data = [entry]
+            elif coin_id:
+                try:
+                    data = CoinGecko().get_coins_markets(
+                        vs_cur,
+                        ids=coin_id,
+                        order="volume_desc")
+                except Exception as e:
+                    return self.handle_error(e, update)
 
             if not data:
                 update.message.reply_text(
@@ -1,17 +1,21 @@
+import logging
 import opencryptobot.emoji as emo
 import opencryptobot.api.webscraping as webs
 
 from telegram import ParseMode
 from telegram.error import BadRequest
+from opencryptobot.api.aio import AsyncLoop
 from opencryptobot.ratelimit import RateLimit
 from opencryptobot.api.apicache import APICache
+from opencryptobot.config import ConfigManager as Cfg
 from opencryptobot.api.cryptocompare import CryptoCompare
 from opencryptobot.plugin import OpenCryptoPlugin, Category
 
 
 class Whitepaper(OpenCryptoPlugin):
 
-    name = None
+    # Name and link of found whitepapers by symbol
+    _cache = dict()
 
     def get_cmds(self):
         return ["wp", "whitepaper"]
@@ -31,27 +35,37 @@ class Whitepaper(OpenCryptoPlugin):
         if len(args) > 1:
             search = args[1]
 
-        try:
-            link = self._from_allcryptowhitepaper(coin)
+        whitepaper = self._read_cache(coin)
 
-            if not link:
-                if RateLimit.limit_reached(update):
-                    return
+        if not whitepaper:
+            if RateLimit.limit_reached(update):
+                return
 
-                link = self._from_coinmarketcap(coin)
+            sources = [
+                lambda: self._from_allcryptowhitepaper(coin),
+                lambda: self._from_coinmarketcap(coin)]
 
-            if not link and search == "all":
-                link = self._from_coinpaprika(coin)
-        except Exception as e:
-            return self.handle_error(e, update)
+            if search == "all":
+                sources.append(lambda: self._from_coinpaprika(coin))
+
+            # Query all sources at once and use first whitepaper found
+            try:
+                whitepaper = AsyncLoop.first(*sources)
+            except Exception as e:
+                return self.handle_error(e, update)
+
+            if whitepaper:
+                self._save_cache(coin, *whitepaper)
+
+        if whitepaper:
+            name, link = whitepaper
 
-        if link:
             try:
                 update.message.reply_document(
                     document=link,
-                    caption=f"{self.name} Whitepaper")
+                    caption=f"{name} Whitepaper")
             except BadRequest:
-                msg = f"{self.name} Whitepaper\n{link}"
+                msg = f"{name} Whitepaper\n{link}"
                 update.message.reply_text(text=msg)
         else:
             update.message.reply_text(
@@ -67,38 +81,68 @@ class Whitepaper(OpenCryptoPlugin):
     def get_category(self):
         return Category.GENERAL
 
+    def _read_cache(self, coin):
+        if coin not in Whitepaper._cache and Cfg.get("database", "use_db"):
+            try:
+                whitepaper = self.tgb.db.read_wp(coin)
+            except Exception as e:
+                logging.error(f"Can't read whitepaper for {coin}: {e}")
+                return None
+
+            if whitepaper:
+                Whitepaper._cache[coin] = tuple(whitepaper)
+
+        return Whitepaper._cache.get(coin)
+
+    def _save_cache(self, coin, name, link):
+        Whitepaper._cache[coin] = (name, link)
+
+        if Cfg.get("database", "use_db"):
+            try:
+                self.tgb.db.save_wp(coin, name, link)
+            except Exception as e:
+                logging.error(f"Can't save whitepaper for {coin}: {e}")
+
+    # Sources return tuple with name of coin and link to whitepaper
+
     def _from_allcryptowhitepaper(self, coin):
         coin_info = CryptoCompare().get_coin_general_info(coin, "USD")
 
         if coin_info["Message"] != "Success":
             return None
 
-        self.name = coin_info["Data"][0]["CoinInfo"]["FullName"].replace(" ", "-")
-        return webs.get_wp_allcryptowhitepaper(self.name)
+        name = coin_info["Data"][0]["CoinInfo"]["FullName"].replace(" ", "-")
+        link = webs.get_wp_allcryptowhitepaper(name)
+
+        return (name, link) if link else None
 
     def _from_coinmarketcap(self, coin):
-        slug = str()
+        name = slug = str()
 
         for listing in APICache.get_cmc_coin_list():
             if coin.upper() == listing["symbol"].upper():
-                self.name = listing["name"].capitalize()
+                name = listing["name"].capitalize()
                 slug = listing["website_slug"]
                 break
 
         if not slug:
             return None
 
-        return webs.get_wp_coinmarketcap(slug)
+        link = webs.get_wp_coinmarketcap(slug)
+
+        return (name, link) if link else None
 
     def _from_coinpaprika(self, coin):
-        coin_id = str()
+        name = coin_id = str()
 
         for c in APICache.get_cp_coin_list():
             if c["symbol"] == coin:
-                self.name = c["name"]
+                name = c["name"]
                 coin_id = c["id"]
 
         if not coin_id:
             return None
 
-        return webs.get_wp_coinpaprika(coin_id)
+        link = webs.get_wp_coinpaprika(coin_id)
+
+        return (name, link) if link else None
@@ -0,0 +1,70 @@
+import time
+import logging
+import threading
+
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """Records how long the steps of the startup take and logs them as
+    a report with the slowest steps first. Does nothing if not enabled"""
+
+    # Time the profiler module was imported. That's the first
+    # import of the bot, so it's the start of the startup
+    START = time.monotonic()
+
+    _enabled = False
+
+    # List of tuples with name of step, duration and end of step (both
+    # in seconds). Plugins are loaded concurrently so their times overlap
+    _steps = list()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def enable():
+        StartupProfiler._enabled = True
+
+    @staticmethod
+    def is_enabled():
+        return StartupProfiler._enabled
+
+    @staticmethod
+    @contextmanager
+    def measure(name):
+        """Context manager that records the time of the enclosed block"""
+
+        if not StartupProfiler._enabled:
+            yield
+            return
+
+        start = time.monotonic()
+
+        try:
+            yield
+        finally:
+            StartupProfiler.add(name, time.monotonic() - start)
+
+    @staticmethod
+    def add(name, seconds):
+        if not StartupProfiler._enabled:
+            return
+
+        with StartupProfiler._lock:
+            StartupProfiler._steps.append((name, seconds, time.monotonic() - StartupProfiler.START))
+
+    @staticmethod
+    def report(title="Startup profile"):
+        """Log all recorded steps, slowest first"""
+
+        if not StartupProfiler._enabled:
+            return
+
+        with StartupProfiler._lock:
+            steps = sorted(StartupProfiler._steps, key=lambda s: s[1], reverse=True)
+
+        elapsed = time.monotonic() - StartupProfiler.START
+
+        lines = [f"{title} - {elapsed:.3f} seconds since start, {len(steps)} steps:"]
+        lines.extend(f"{sec:9.3f}s {sec / elapsed:6.1%}  at {end:8.3f}s  {name}" for name, sec, end in steps)
+
+        logging.info("\n".join(lines))
@@ -1,12 +1,206 @@
+import os
+import time
+import sqlite3
 import logging
+import threading
 import opencryptobot.emoji as emo
+import opencryptobot.constants as con
 
 from opencryptobot.config import ConfigManager as Cfg
+from opencryptobot.sqlmanager import SQLManager
+
+
+# All backends use a sliding window limit: requests of the previous window
+# count with the part of the window that still overlaps the last 't'
+# seconds. That prevents bursts of twice the rate at the border of two
+# windows and only needs three numbers per key
+
+
+def _estimate(previous, current, elapsed, t):
+    return previous * (1 - elapsed / t) + current
+
+
+class _Shard:
+    """Part of the rate limit state with its own lock. For every key it holds
+    the start of the current window and the number of requests in the
+    previous and in the current window"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.windows = dict()
+        self.next_eviction = 0
+
+
+class MemoryBackend:
+    """Rate limit state in this process. Default backend"""
+
+    SHARDS = 16
+
+    def __init__(self):
+        self._shards = tuple(_Shard() for _ in range(self.SHARDS))
+
+    def hit(self, key, rate, t):
+        """Count request for key. Return True if the limit is reached.
+        Requests that exceed the limit aren't counted"""
+
+        shard = self._shards[hash(key) % self.SHARDS]
+
+        now = time.monotonic()
+
+        with shard.lock:
+            self._evict(shard, now, t)
+
+            window = shard.windows.get(key)
+
+            if window is None:
+                shard.windows[key] = [now, 0, 1]
+                return False
+
+            start, previous, current = window
+
+            # Move window forward
+            if now - start >= t:
+                windows = int((now - start) // t)
+                previous = current if windows == 1 else 0
+                current = 0
+                start += windows * t
+
+            if _estimate(previous, current, now - start, t) >= rate:
+                window[:] = start, previous, current
+                return True
+
+            window[:] = start, previous, current + 1
+            return False
+
+    def _evict(self, shard, now, t):
+        """Remove keys without requests in the last two windows. Runs
+        at most once per window and shard, lock has to be held"""
+
+        if now < shard.next_eviction:
+            return
+
+        shard.next_eviction = now + t
+
+        idle = [k for k, w in shard.windows.items() if now - w[0] >= 2 * t]
+
+        for key in idle:
+            del shard.windows[key]
+
+
+class SQLiteBackend:
+    """Rate limit state in a SQLite file that several
+    processes on the same host can share"""
+
+    DEF_PATH = os.path.join(con.DAT_DIR, "ratelimit.db")
+
+    def __init__(self, path=None):
+        path = path or self.DEF_PATH
+
+        data_dir = os.path.dirname(path)
+        if data_dir:
+            os.makedirs(data_dir, exist_ok=True)
+
+        # Transactions are started explicitly
+        self._con = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("PRAGMA synchronous=NORMAL")
+        self._con.execute(self.get_sql("windows"))
+
+        self._lock = threading.Lock()
+        self._next_eviction = 0
+
+        self.read_sql = self.get_sql("window_read")
+        self.hit_sql = self.get_sql("window_hit")
+        self.evict_sql = self.get_sql("window_evict")
+
+    def get_sql(self, filename):
+        return SQLManager.get(type(self).__name__.lower(), filename)
+
+    def hit(self, key, rate, t):
+        now = time.time()
+        window = int(now // t)
+
+        with self._lock:
+            cur = self._con.cursor()
+
+            # Lock database for writing so that other
+            # processes can't read the same count
+            cur.execute("BEGIN IMMEDIATE")
+
+            try:
+                counts = dict(cur.execute(self.read_sql, [key, window - 1, window]).fetchall())
+
+                previous = counts.get(window - 1, 0)
+                current = counts.get(window, 0)
+
+                reached = _estimate(previous, current, now - window * t, t) >= rate
+
+                if not reached:
+                    cur.execute(self.hit_sql, [key, window])
+
+                if now >= self._next_eviction:
+                    self._next_eviction = now + t
+                    cur.execute(self.evict_sql, [window - 1])
+
+                cur.execute("COMMIT")
+            except Exception as e:
+                cur.execute("ROLLBACK")
+                raise e
+
+        return reached
+
+
+class RedisBackend:
+    """Rate limit state on a Redis server (or any server that speaks the
+    Redis protocol) that several processes and hosts can share"""
+
+    DEF_URL = "redis://localhost:6379/0"
+
+    PREFIX = "opencryptobot:ratelimit:"
+
+    def __init__(self, url=None, client=None):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url or self.DEF_URL)
+
+        self._redis = client
+
+    def hit(self, key, rate, t):
+        now = time.time()
+        window = int(now // t)
+
+        cur_key = f"{self.PREFIX}{key}:{window}"
+        prv_key = f"{self.PREFIX}{key}:{window - 1}"
+
+        # Keys expire by themselves after two windows
+        pipe = self._redis.pipeline()
+        pipe.incr(cur_key)
+        pipe.expire(cur_key, 2 * t)
+        pipe.get(prv_key)
+        current, _, previous = pipe.execute()
+
+        # INCR is atomic, so every concurrent request sees
+        # a different count. 'current' includes this request
+        previous = int(previous or 0)
+
+        if _estimate(previous, current - 1, now - window * t, t) >= rate:
+            # Don't count requests that exceed the limit
+            self._redis.decr(cur_key)
+            return True
+
+        return False
 
 
 class RateLimit:
 
-    _data = dict()
+    BACKENDS = {
+        "memory": MemoryBackend,
+        "sqlite": SQLiteBackend,
+        "redis": RedisBackend
+    }
+
+    _backend = None
+    _lock = threading.Lock()
 
     @staticmethod
     def limit_reached(update):
@@ -41,48 +235,50 @@ class RateLimit:
         if not user_id:
             return False
 
-        import time
-        now = int(time.time())
+        # Same format for every backend. Shared backends need a string
+        key = f"{user_id}:{command}" if command else str(user_id)
 
-        if command:
-            # Rate limit per user & command
-            if command not in RateLimit._data:
-                RateLimit._data[command] = dict()
-            if user_id not in RateLimit._data[command]:
-                RateLimit._data[command][user_id] = [1, now]
-                return False
+        try:
+            reached = RateLimit.get_backend().hit(key, int(rate), int(t))
+        except Exception as e:
+            # Shared backend not reachable - don't block users
+            logging.error(f"Rate limit backend failed: {repr(e)}")
+            return False
 
-            count = RateLimit._data[command][user_id][0]
-            start = RateLimit._data[command][user_id][1]
-
-            if (start + int(t)) > now:
-                if count == int(rate):
-                    logging.debug(f"User {user_id} reached rate "
-                                  f"limit at command '{command}'")
-                    return True
-                else:
-                    RateLimit._data[command][user_id][0] += 1
-                    return False
+        if reached:
+            if command:
+                logging.debug(f"User {user_id} reached rate "
+                              f"limit at command '{command}'")
             else:
-                RateLimit._data[command][user_id] = [1, now]
-                return False
-        else:
-            # Rate limit per user
-            if user_id not in RateLimit._data:
-                RateLimit._data[user_id] = [1, now]
-                return False
+                logging.debug(f"User {user_id} reached rate limit")
 
-            count = RateLimit._data[user_id][0]
-            start = RateLimit._data[user_id][1]
+        return reached
 
-            if (start + int(t)) > now:
-                if count == int(rate):
-                    logging.debug(f"User {user_id} reached rate limit")
-                    return True
-                else:
-                    RateLimit._data[user_id][0] += 1
-                    return False
-            else:
-                RateLimit._data[user_id] = [1, now]
-                return False
+    @staticmethod
+    def get_backend():
+        if RateLimit._backend is None:
+            with RateLimit._lock:
+                if RateLimit._backend is None:
+                    RateLimit._backend = RateLimit._create_backend()
+        return RateLimit._backend
+
+    @staticmethod
+    def set_backend(backend):
+        with RateLimit._lock:
+            RateLimit._backend = backend
+
+    @staticmethod
+    def _create_backend():
+        name = Cfg.get("rate_limit", "backend") or "memory"
+        url = Cfg.get("rate_limit", "backend_url")
+
+        if name not in RateLimit.BACKENDS:
+            logging.error(f"Unknown rate limit backend '{name}' - using memory")
+            return MemoryBackend()
+
+        logging.info(f"Rate limit backend: {name}")
+
+        if name == "memory":
+            return MemoryBackend()
 
+        return RateLimit.BACKENDS[name](url)
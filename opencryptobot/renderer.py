@@ -0,0 +1,230 @@
+import logging
+import threading
+import multiprocessing
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from opencryptobot.config import ConfigManager as Cfg
+
+
+class RenderQueueFull(Exception):
+    pass
+
+
+class RenderTimeout(Exception):
+    pass
+
+
+def _warm_up(engine):
+    """Start renderer in the worker so that the first job doesn't pay for it"""
+
+    try:
+        if engine == "matplotlib":
+            from opencryptobot.nativechart import NativeChart
+            NativeChart.price_volume("", "", [[0, 1], [1, 1]], [[0, 1], [1, 1]])
+        else:
+            import plotly.io as pio
+            import plotly.graph_objs as go
+            pio.to_image(go.Figure(), format="png")
+    except Exception as e:
+        logging.error(f"Can't warm up chart renderer: {repr(e)}")
+
+
+def _render(fig, fmt):
+    import plotly.io as pio
+    return pio.to_image(fig, format=fmt)
+
+
+class ChartRenderer:
+    """Renders plotly figures to images in a pool of worker processes so
+    that rendering doesn't block dispatcher threads. Every worker keeps
+    its own kaleido process running between jobs"""
+
+    ENGINES = ("plotly", "matplotlib")
+
+    DEF_ENGINE = "plotly"
+    DEF_WORKERS = 2
+    DEF_QUEUE_SIZE = 20  # Max number of jobs that are queued or rendering
+    DEF_TIMEOUT = 30  # In seconds
+
+    _pool = None
+    _slots = None
+    _senders = None
+    _lock = threading.Lock()
+
+    # Futures of jobs that are queued or rendering, to cancel them
+    # on shutdown (executor can do that itself only since Python 3.9)
+    _futures = set()
+
+    @staticmethod
+    def render_png(fig):
+        """Return future with PNG image of figure as bytes"""
+
+        return ChartRenderer.submit(fig, "png")
+
+    @staticmethod
+    def render_jpeg(fig):
+        """Return future with JPEG image of figure as bytes"""
+
+        return ChartRenderer.submit(fig, "jpeg")
+
+    @staticmethod
+    def get_engine():
+        """Return configured engine for PNG charts: 'plotly' renders figures
+        with kaleido, 'matplotlib' renders arrays with 'NativeChart'"""
+
+        engine = Cfg.get("chart_render", "engine")
+        return engine if engine in ChartRenderer.ENGINES else ChartRenderer.DEF_ENGINE
+
+    @staticmethod
+    def submit(fig, fmt):
+        """Queue figure for rendering and return a future. Raises
+        'RenderQueueFull' if too many jobs are waiting already"""
+
+        # Figures are sent as dict, that's cheaper to pickle
+        return ChartRenderer.submit_call(_render, fig.to_dict(), fmt)
+
+    @staticmethod
+    def submit_call(func, *args):
+        """Queue call of a function that returns an image (for example
+        of 'NativeChart') and return a future. Function and arguments
+        have to be picklable"""
+
+        pool, slots = ChartRenderer._get_pool()
+
+        if not slots.acquire(blocking=False):
+            raise RenderQueueFull("Too many charts in queue. Try again later")
+
+        try:
+            future = pool.submit(func, *args)
+        except Exception as e:
+            slots.release()
+            raise e
+
+        with ChartRenderer._lock:
+            ChartRenderer._futures.add(future)
+
+        future.add_done_callback(ChartRenderer._done)
+        future.add_done_callback(lambda _: slots.release())
+        return future
+
+    @staticmethod
+    def render(fig, fmt="png", timeout=None):
+        """Render figure and wait for the image"""
+
+        return ChartRenderer.result(ChartRenderer.submit(fig, fmt), timeout)
+
+    @staticmethod
+    def result(future, timeout=None):
+        """Wait for image of future. Raises 'RenderTimeout' if
+        rendering takes longer than the configured timeout"""
+
+        if timeout is None:
+            timeout = Cfg.get("chart_render", "timeout") or ChartRenderer.DEF_TIMEOUT
+
+        try:
+            return future.result(timeout)
+        except FutureTimeout:
+            # A hanging worker can't be stopped on its own
+            if not future.cancel():
+                ChartRenderer._restart()
+
+            raise RenderTimeout(f"Rendering chart took longer than {timeout} seconds")
+
+    @staticmethod
+    def when_done(future, callback, errback):
+        """Call 'callback(image)' once the image of the future is rendered
+        or 'errback(error)' if rendering failed. Both are called in a
+        background thread, the calling thread doesn't have to wait"""
+
+        def _wait():
+            try:
+                image = ChartRenderer.result(future)
+            except Exception as e:
+                return errback(e)
+
+            try:
+                callback(image)
+            except Exception as e:
+                logging.error(f"Can't send rendered chart: {repr(e)}")
+
+        ChartRenderer._get_senders().submit(_wait)
+
+    @staticmethod
+    def shutdown():
+        with ChartRenderer._lock:
+            pool = ChartRenderer._pool
+            futures = list(ChartRenderer._futures)
+            ChartRenderer._pool = None
+
+        if pool is not None:
+            # Jobs that are already rendering can't be cancelled
+            for future in futures:
+                future.cancel()
+
+            pool.shutdown(wait=False)
+
+    @staticmethod
+    def _get_pool():
+        if ChartRenderer._pool is None:
+            with ChartRenderer._lock:
+                if ChartRenderer._pool is None:
+                    workers = Cfg.get("chart_render", "workers")
+                    queue_size = Cfg.get("chart_render", "queue_size")
+
+                    # Processes are spawned, forking a process
+                    # with running threads isn't safe
+                    ChartRenderer._pool = ProcessPoolExecutor(
+                        max_workers=workers or ChartRenderer.DEF_WORKERS,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_warm_up,
+                        initargs=(ChartRenderer.get_engine(),))
+
+                    ChartRenderer._slots = threading.BoundedSemaphore(
+                        queue_size or ChartRenderer.DEF_QUEUE_SIZE)
+
+        return ChartRenderer._pool, ChartRenderer._slots
+
+    @staticmethod
+    def _get_senders():
+        if ChartRenderer._senders is None:
+            with ChartRenderer._lock:
+                if ChartRenderer._senders is None:
+                    queue_size = Cfg.get("chart_render", "queue_size")
+
+                    # One thread per job that can be in the queue
+                    ChartRenderer._senders = ThreadPoolExecutor(
+                        max_workers=queue_size or ChartRenderer.DEF_QUEUE_SIZE,
+                        thread_name_prefix="ChartSender")
+
+        return ChartRenderer._senders
+
+    @staticmethod
+    def _restart():
+        """Replace pool and kill its workers"""
+
+        with ChartRenderer._lock:
+            pool = ChartRenderer._pool
+            ChartRenderer._pool = None
+
+            # Executor has no public way to kill a worker. Its workers are
+            # the only child processes and a new pool can't be created
+            # while the lock is held
+            processes = multiprocessing.active_children() if pool else list()
+
+        if pool is None:
+            return
+
+        logging.warning("Chart renderer timed out - restarting workers")
+
+        pool.shutdown(wait=False)
+
+        # Jobs that are still queued fail with 'BrokenProcessPool'. They
+        # can't be cancelled, the pool would try to set their exception
+        for process in processes:
+            process.terminate()
+
+    @staticmethod
+    def _done(future):
+        with ChartRenderer._lock:
+            ChartRenderer._futures.discard(future)
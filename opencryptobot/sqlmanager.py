@@ -0,0 +1,80 @@
+import os
+import logging
+import opencryptobot.constants as con
+
+from watchdog.observers import Observer
+from watchdog.events import FileSystemEventHandler
+
+
+class SQLManager:
+
+    _SQL_DIR = con.SQL_DIR
+
+    # Key is tuple of sub-directory (lower case class
+    # name) and file name without extension
+    _sql = dict()
+
+    def __init__(self, sql_dir=None, watch=False):
+        if sql_dir:
+            SQLManager._SQL_DIR = sql_dir
+
+        SQLManager._read_sql()
+
+        if watch:
+            SQLManager._watch_changes()
+
+    # Watch for changed SQL files
+    @staticmethod
+    def _watch_changes():
+        observer = Observer()
+        observer.daemon = True
+
+        change_handler = SQLChangeHandler()
+
+        observer.schedule(change_handler, SQLManager._SQL_DIR, recursive=True)
+        observer.start()
+
+    # Read all SQL files in all sub-directories
+    @staticmethod
+    def _read_sql():
+        sql = dict()
+
+        for root, _, files in os.walk(SQLManager._SQL_DIR):
+            section = os.path.relpath(root, SQLManager._SQL_DIR)
+
+            for file in files:
+                name, ext = os.path.splitext(file)
+
+                if ext != ".sql":
+                    continue
+
+                with open(os.path.join(root, file), "r", encoding="utf8") as f:
+                    sql[(section, name)] = f.read()
+
+        # Replace all statements at once
+        SQLManager._sql = sql
+
+    @staticmethod
+    def get(section, name):
+        if not SQLManager._sql:
+            SQLManager._read_sql()
+
+        try:
+            return SQLManager._sql[(section, name)]
+        except KeyError:
+            sql_file = os.path.join(SQLManager._SQL_DIR, section, f"{name}.sql")
+            raise FileNotFoundError(f"No SQL file '{sql_file}' found")
+
+
+class SQLChangeHandler(FileSystemEventHandler):
+
+    @staticmethod
+    def _reload(event):
+        if event.is_directory or not event.src_path.endswith(".sql"):
+            return
+
+        logging.info(f"SQL file changed: {event.src_path}")
+        SQLManager._read_sql()
+
+    # Not 'on_any_event' because reading the files would trigger it again
+    on_created = on_deleted = on_modified = on_moved = _reload
@@ -1,12 +1,21 @@
 import os
 import json
+import time
 import logging
 import opencryptobot.constants as con
 
 from argparse import ArgumentParser
+from opencryptobot.profiler import StartupProfiler
 from opencryptobot.database import Database
 from opencryptobot.telegrambot import TelegramBot
 from opencryptobot.config import ConfigManager as Cfg
+from opencryptobot.sqlmanager import SQLManager
+from opencryptobot.renderer import ChartRenderer
+from opencryptobot.ohlcvstore import OHLCVStore
+from opencryptobot.pluginmanifest import PluginManifest
+from opencryptobot.statusserver import StatusServer
+from opencryptobot.metrics import Metrics
+from opencryptobot.health import HealthCheck
 from logging.handlers import TimedRotatingFileHandler
 
 
@@ -16,21 +25,38 @@ class OpenCryptoBot:
         # Parse command line arguments
         self.args = self._parse_args()
 
+        # Record how long the steps of the startup take
+        if self.args.profile:
+            StartupProfiler.enable()
+            StartupProfiler.add("Import modules", time.monotonic() - StartupProfiler.START)
+
         # Load config file
-        Cfg(self.args.config)
+        with StartupProfiler.measure("Load config"):
+            Cfg(self.args.config)
+
+        # Load SQL statements
+        with StartupProfiler.measure("Load SQL statements"):
+            SQLManager(watch=Cfg.get("database", "sql_reload"))
 
         # Set up logging
         log_path = self.args.logfile
         log_level = self.args.loglevel
         self._init_logger(log_path, log_level)
 
+        # Only save plugin manifest
+        if self.args.manifest:
+            PluginManifest.write()
+            exit()
+
         # Create database
         db_path = self.args.database
-        self.db = Database(db_path)
+        with StartupProfiler.measure("Initialize database"):
+            self.db = Database(db_path)
 
         # Create bot
         bot_token = self._get_bot_token()
-        self.tg = TelegramBot(bot_token, self.db)
+        with StartupProfiler.measure("Create bot"):
+            self.tg = TelegramBot(bot_token, self.db)
 
     # Parse arguments
     def _parse_args(self):
@@ -95,6 +121,22 @@ class OpenCryptoBot:
             action="store_true",
             required=False)
 
+        # Save plugin manifest and exit
+        parser.add_argument(
+            "--manifest",
+            dest="manifest",
+            help="save plugin manifest for lazy loading and exit",
+            action="store_true",
+            required=False)
+
+        # Profile startup
+        parser.add_argument(
+            "--profile",
+            dest="profile",
+            help="log how long the steps of the startup take",
+            action="store_true",
+            required=False)
+
         return parser.parse_args()
 
     # Configure logging
@@ -164,8 +206,22 @@ class OpenCryptoBot:
                 logging.error("Failed to start polling")
                 return
 
+        StartupProfiler.report("Startup profile - bot ready")
+
+        # Serve metrics in Prometheus format, liveness and readiness
+        health = HealthCheck(self.tg, self.db)
+        StatusServer.add_route("/metrics", Metrics.respond)
+        StatusServer.add_route("/health", health.respond_health, public=True)
+        StatusServer.add_route("/ready", health.respond_ready, public=True)
+        StatusServer.start()
+
         self.tg.bot_idle()
 
+        StatusServer.stop()
+        ChartRenderer.shutdown()
+        OHLCVStore.close()
+        self.db.close()
+
 
 if __name__ == '__main__':
     OpenCryptoBot().start()
@@ -0,0 +1,101 @@
+import logging
+import threading
+
+from urllib.parse import urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from opencryptobot.config import ConfigManager as Cfg
+
+
+class StatusServer:
+    """Small HTTP server for monitoring that runs next to the bot. Every
+    path has a handler that returns a tuple of status code, content
+    type and body. Public paths can also be served on a second port
+    (for load balancers), all others only on the main one"""
+
+    DEF_LISTEN = "127.0.0.1"
+    DEF_PORT = 9090
+    DEF_PUBLIC_LISTEN = "0.0.0.0"
+
+    # Key is path, value is tuple of handler and if it's public
+    _routes = dict()
+
+    _servers = list()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def add_route(path, handler, public=False):
+        StatusServer._routes[path] = (handler, public)
+
+    @staticmethod
+    def start():
+        if not Cfg.get("status_server", "enabled"):
+            return
+
+        listen = Cfg.get("status_server", "listen") or StatusServer.DEF_LISTEN
+        port = Cfg.get("status_server", "port") or StatusServer.DEF_PORT
+
+        public_listen = Cfg.get("status_server", "public_listen") or StatusServer.DEF_PUBLIC_LISTEN
+        public_port = Cfg.get("status_server", "public_port")
+
+        with StatusServer._lock:
+            if StatusServer._servers:
+                return
+
+            StatusServer._serve(listen, port, public_only=False)
+
+            if public_port:
+                StatusServer._serve(public_listen, public_port, public_only=True)
+
+    @staticmethod
+    def stop():
+        with StatusServer._lock:
+            for server in StatusServer._servers:
+                server.shutdown()
+                server.server_close()
+
+            StatusServer._servers = list()
+
+    @staticmethod
+    def _serve(listen, port, public_only):
+        try:
+            server = ThreadingHTTPServer((listen, port), _StatusHandler)
+            server.daemon_threads = True
+            server.public_only = public_only
+        except Exception as e:
+            logging.error(f"Can't start status server on {listen}:{port}: {repr(e)}")
+            return
+
+        thread = threading.Thread(target=server.serve_forever, name="StatusServer", daemon=True)
+        thread.start()
+
+        StatusServer._servers.append(server)
+
+        paths = "public paths" if public_only else "all paths"
+        logging.info(f"Status server listening on {listen}:{port} ({paths})")
+
+
+class _StatusHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        handler, public = StatusServer._routes.get(urlsplit(self.path).path, (None, False))
+
+        if handler is None or (self.server.public_only and not public):
+            status, content_type, body = 404, "text/plain", "Not found\n"
+        else:
+            try:
+                status, content_type, body = handler()
+            except Exception as e:
+                logging.error(f"Status server can't handle '{self.path}': {repr(e)}")
+                status, content_type, body = 500, "text/plain", "Internal error\n"
+
+        data = body.encode("utf-8")
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    # Don't log every request
+    def log_message(self, format, *args):
+        logging.debug(f"Status server: {format % args}")
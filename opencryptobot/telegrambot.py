@@ -8,9 +8,13 @@ import opencryptobot.utils as utl
 import opencryptobot.constants as con
 
 from importlib import reload
-from opencryptobot.plugin import Keyword
+from types import MappingProxyType
+from opencryptobot.plugin import Keyword, LazyPlugin
+from opencryptobot.profiler import StartupProfiler
+from opencryptobot.pluginmanifest import PluginManifest
 from opencryptobot.api.github import GitHub
 from opencryptobot.api.apicache import APICache
+from opencryptobot.api.marketcache import MarketCache
 from opencryptobot.config import ConfigManager as Cfg
 
 from telegram import ParseMode, InlineQueryResultArticle, InputTextMessageContent, Chat
@@ -29,12 +33,16 @@ def threaded(fn):
 
 class TelegramBot:
 
-    plugins = list()
-
     def __init__(self, bot_token, bot_db):
         self.db = bot_db
         self.token = bot_token
 
+        # Loaded plugins and index of command (lower case) to plugin.
+        # Both are replaced as a whole so that readers don't need a lock
+        self.plugins = tuple()
+        self.commands = MappingProxyType(dict())
+        self._plugin_lock = threading.Lock()
+
         read_timeout = os.getenv("TELEGRAM_READ_TIMEOUT") or Cfg.get("telegram", "read_timeout")
         connect_timeout = os.getenv("TELEGRAM_CONNECT_TIMEOUT") or Cfg.get("telegram", "connect_timeout")
 
@@ -47,15 +55,24 @@ class TelegramBot:
         logging.info(f"Telegram connection settings: read_timeout={read_timeout}, connect_timeout={connect_timeout}")
 
         try:
-            self.updater = Updater(bot_token, request_kwargs=kwargs)
+            with StartupProfiler.measure("Create updater"):
+                self.updater = Updater(bot_token, request_kwargs=kwargs)
+
             self.bot = self.updater.bot
             self.job_queue = self.updater.job_queue
             self.dispatcher = self.updater.dispatcher
 
             # Load plugins
-            self._load_plugins()
+            with StartupProfiler.measure("Load plugins"):
+                self._load_plugins()
             logging.info("Plugins loaded")
 
+            # Refresh cached coin lists periodically
+            self._refresh_cache()
+
+            # Download markets of top coins periodically
+            self._prefetch_markets()
+
         except InvalidToken:
             logging.error("Bot token not valid")
             exit("Bot token not valid")
@@ -103,10 +120,10 @@ class TelegramBot:
         cmd = update.effective_message.text.split('__')[0].replace("/_", "")
         args = update.effective_message.text.split('__')[1].split("_")
 
-        for p in self.plugins:
-            if cmd.lower() in p.get_cmds():
-                p.get_action(bot, update, args=args)
-                break
+        plugin = self.get_plugin(cmd)
+
+        if plugin:
+            plugin.get_action(bot, update, args=args)
 
     def _add_link_handler(self):
         self.dispatcher.add_handler(RegexHandler(
@@ -115,14 +132,16 @@ class TelegramBot:
     def _load_plugins(self):
         threads = list()
 
-        for _, _, files in os.walk(os.path.join(con.SRC_DIR, con.PLG_DIR)):
-            for file in files:
-                if not file.lower().endswith(".py"):
-                    continue
-                if file.startswith("_"):
-                    continue
+        # Plugins in the manifest are imported on first use
+        manifest = PluginManifest.read() if Cfg.get("lazy_plugins") else dict()
 
-                threads.append(self._load_plugin(file))
+        for module_name in PluginManifest.get_modules():
+            entry = manifest.get(module_name)
+
+            if entry and entry["lazy"]:
+                LazyPlugin(self, module_name, entry)
+            else:
+                threads.append(self._load_plugin(module_name))
 
         # Make sure that all plugins are loaded
         for thread in threads:
@@ -132,26 +151,66 @@ class TelegramBot:
             plugin.after_plugins_loaded()
 
     @threaded
-    def _load_plugin(self, file):
+    def _load_plugin(self, module_name):
         try:
-            module_name = file[:-3]
-            module_path = f"{con.SRC_DIR}.{con.PLG_DIR}.{module_name}"
-            module = importlib.import_module(module_path)
-
-            plugin_class = getattr(module, module_name.capitalize())
-            plugin_class(self).after_plugin_loaded()
+            self.load_plugin(module_name)
         except Exception as ex:
-            msg = f"File '{file}' can't be loaded as a plugin: {ex}"
+            msg = f"File '{module_name}.py' can't be loaded as a plugin: {ex}"
             logging.warning(msg)
 
+    def load_plugin(self, module_name):
+        """Import plugin module, load the plugin and return it"""
+
+        module_path = f"{con.SRC_DIR}.{con.PLG_DIR}.{module_name}"
+
+        with StartupProfiler.measure(f"Import plugin {module_name}"):
+            module = importlib.import_module(module_path)
+
+        plugin_class = getattr(module, module_name.capitalize())
+
+        with StartupProfiler.measure(f"Create plugin {module_name}"):
+            plugin = plugin_class(self)
+            plugin.after_plugin_loaded()
+
+        return plugin
+
+    def get_plugin(self, cmd):
+        """Return plugin that handles command (without '/') or None"""
+
+        return self.commands.get(cmd.lower())
+
+    def register_plugin(self, plugin):
+        """Add plugin and its commands to the index. Replaces a loaded
+        plugin of the same module (after a reload or a lazy load)"""
+
+        with self._plugin_lock:
+            old = [p for p in self.plugins if p.get_name() == plugin.get_name()]
+
+            plugins = [p for p in self.plugins if p not in old]
+            plugins.append(plugin)
+
+            commands = {c: p for c, p in self.commands.items() if p not in old}
+            for cmd in plugin.get_cmds():
+                commands[cmd.lower()] = plugin
+
+            self.plugins = tuple(plugins)
+            self.commands = MappingProxyType(commands)
+
+    def unregister_plugin(self, plugin):
+        """Remove plugin and its commands from the index"""
+
+        with self._plugin_lock:
+            self.plugins = tuple(p for p in self.plugins if p is not plugin)
+            self.commands = MappingProxyType({c: p for c, p in self.commands.items() if p is not plugin})
+
     def remove_plugin(self, module_name):
         for plugin in self.plugins:
-            if type(plugin).__name__.lower() == module_name.lower():
+            if plugin.get_name() == module_name.lower():
                 plugin.remove_plugin()
                 break
 
     def reload_plugin(self, module_name):
-        self.remove_plugin(module_name)
+        old = [p for p in self.plugins if p.get_name() == module_name.lower()]
 
         try:
             module_path = f"{con.SRC_DIR}.{con.PLG_DIR}.{module_name}"
@@ -159,6 +218,7 @@ class TelegramBot:
 
             reload(module)
 
+            # Replaces old plugin in the index at once
             plugin_class = getattr(module, module_name.capitalize())
             plugin_class(self)
         except Exception as ex:
@@ -166,6 +226,10 @@ class TelegramBot:
             logging.warning(msg)
             raise ex
 
+        # Remove handlers of old plugin
+        for plugin in old:
+            plugin.remove_plugin()
+
     def _download(self, bot, update):
         # Check if in a private chat
         if bot.get_chat(update.message.chat_id).type != Chat.PRIVATE:
@@ -209,20 +273,16 @@ class TelegramBot:
 
         args.append(f"{Keyword.INLINE}=true")
 
-        plgn = None
-        for plugin in self.plugins:
-            if cmd in plugin.get_cmds():
-                if not plugin.inline_mode():
-                    message = "Inline mode not supported"
-                    return _send(f"{emo.INFO} {message}")
-
-                plgn = plugin
-                break
+        plgn = self.get_plugin(cmd)
 
         if not plgn:
             message = "Command not found"
             return _send(f"{emo.INFO} {message}")
 
+        if not plgn.inline_mode():
+            message = "Inline mode not supported"
+            return _send(f"{emo.INFO} {message}")
+
         v = plgn.get_action(bot, update, args=args)
 
         if not v:
@@ -279,6 +339,15 @@ class TelegramBot:
             except Exception as e:
                 logging.error(repr(e))
 
+    def _prefetch_markets(self):
+        if Cfg.get("market_prefetch", "enabled"):
+            sec = MarketCache.get_interval()
+
+            try:
+                self.job_queue.run_repeating(MarketCache.refresh, sec, first=0)
+            except Exception as e:
+                logging.error(repr(e))
+
     def _update_check(self):
         def _check_for_update(bot, job):
             user = Cfg.get('update', 'github_user')
@@ -1,2 +1,3 @@
 INSERT INTO chats (chat_id, type, title, username)
-VALUES (?, ?, ?, ?)
\ No newline at end of file
+VALUES (?, ?, ?, ?)
+ON CONFLICT (chat_id) DO NOTHING
\ No newline at end of file
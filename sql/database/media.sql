@@ -0,0 +1,5 @@
+CREATE TABLE IF NOT EXISTS media (
+	hash TEXT NOT NULL PRIMARY KEY,
+	file_id TEXT NOT NULL,
+	date_time DATETIME DEFAULT CURRENT_TIMESTAMP
+)
\ No newline at end of file
@@ -0,0 +1,6 @@
+DELETE FROM media
+WHERE hash IN (
+	SELECT hash FROM media
+	ORDER BY date_time DESC
+	LIMIT -1 OFFSET ?
+)
\ No newline at end of file
@@ -0,0 +1 @@
+CREATE INDEX IF NOT EXISTS media_date_time ON media (date_time)
\ No newline at end of file
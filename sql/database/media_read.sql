@@ -0,0 +1,3 @@
+SELECT file_id
+FROM media
+WHERE hash = ?
\ No newline at end of file
@@ -0,0 +1,2 @@
+INSERT OR REPLACE INTO media (hash, file_id)
+VALUES (?, ?)
\ No newline at end of file
@@ -1,2 +1,3 @@
 INSERT INTO users (user_id, first_name, last_name, username, language)
-VALUES (?, ?, ?, ?, ?)
\ No newline at end of file
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (user_id) DO NOTHING
\ No newline at end of file
@@ -1,3 +0,0 @@
-SELECT EXISTS (
-    SELECT 1 FROM users WHERE user_id = ?
-)
\ No newline at end of file
@@ -0,0 +1,6 @@
+CREATE TABLE IF NOT EXISTS whitepapers (
+	symbol TEXT NOT NULL PRIMARY KEY,
+	name TEXT,
+	link TEXT NOT NULL,
+	date_time DATETIME DEFAULT CURRENT_TIMESTAMP
+)
\ No newline at end of file
@@ -0,0 +1,3 @@
+SELECT name, link
+FROM whitepapers
+WHERE symbol = ?
\ No newline at end of file
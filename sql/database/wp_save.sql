@@ -0,0 +1,2 @@
+INSERT OR REPLACE INTO whitepapers (symbol, name, link)
+VALUES (?, ?, ?)
\ No newline at end of file
@@ -0,0 +1,12 @@
+CREATE TABLE IF NOT EXISTS candles (
+	source TEXT NOT NULL,
+	pair TEXT NOT NULL,
+	granularity INTEGER NOT NULL,
+	time INTEGER NOT NULL,
+	open REAL NOT NULL,
+	high REAL NOT NULL,
+	low REAL NOT NULL,
+	close REAL NOT NULL,
+	volume REAL NOT NULL,
+	PRIMARY KEY (source, pair, granularity, time)
+) WITHOUT ROWID
\ No newline at end of file
@@ -0,0 +1,2 @@
+DELETE FROM candles
+WHERE source = ? AND pair = ? AND granularity = ? AND time < ?
\ No newline at end of file
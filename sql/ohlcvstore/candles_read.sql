@@ -0,0 +1,3 @@
+SELECT time, open, high, low, close, volume FROM candles
+WHERE source = ? AND pair = ? AND granularity = ? AND time >= ?
+ORDER BY time
\ No newline at end of file
@@ -0,0 +1,8 @@
+INSERT INTO candles (source, pair, granularity, time, open, high, low, close, volume)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (source, pair, granularity, time) DO UPDATE SET
+	open = excluded.open,
+	high = excluded.high,
+	low = excluded.low,
+	close = excluded.close,
+	volume = excluded.volume
\ No newline at end of file
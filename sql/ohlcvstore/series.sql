@@ -0,0 +1,8 @@
+CREATE TABLE IF NOT EXISTS series (
+	source TEXT NOT NULL,
+	pair TEXT NOT NULL,
+	granularity INTEGER NOT NULL,
+	first INTEGER NOT NULL,
+	last INTEGER NOT NULL,
+	PRIMARY KEY (source, pair, granularity)
+) WITHOUT ROWID
\ No newline at end of file
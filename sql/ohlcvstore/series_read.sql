@@ -0,0 +1,2 @@
+SELECT first, last FROM series
+WHERE source = ? AND pair = ? AND granularity = ?
\ No newline at end of file
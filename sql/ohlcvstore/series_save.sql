@@ -0,0 +1,3 @@
+INSERT INTO series (source, pair, granularity, first, last)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (source, pair, granularity) DO UPDATE SET first = excluded.first, last = excluded.last
\ No newline at end of file
@@ -0,0 +1,2 @@
+DELETE FROM windows
+WHERE window < ?
\ No newline at end of file
@@ -0,0 +1,3 @@
+INSERT INTO windows (key, window, count)
+VALUES (?, ?, 1)
+ON CONFLICT (key, window) DO UPDATE SET count = count + 1
\ No newline at end of file
@@ -0,0 +1,2 @@
+SELECT window, count FROM windows
+WHERE key = ? AND window IN (?, ?)
\ No newline at end of file
@@ -0,0 +1,6 @@
+CREATE TABLE IF NOT EXISTS windows (
+	key TEXT NOT NULL,
+	window INTEGER NOT NULL,
+	count INTEGER NOT NULL,
+	PRIMARY KEY (key, window)
+) WITHOUT ROWID
\ No newline at end of file